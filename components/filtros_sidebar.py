@@ -0,0 +1,183 @@
+"""Filtros da sidebar compartilhados pelos painéis.
+
+- As opções de cada coluna, os limites do período e os mapas pai -> filhos
+  das cascatas (ex.: só as cidades das regiões escolhidas) são calculados uma
+  vez por versão dos dados (`opcoes_filtros`), não a cada execução.
+- A seleção vai para a URL (?regiao=...&cidade=...&de=...&ate=...) a cada
+  execução: um link compartilhado abre a mesma visão, e a seleção também é
+  guardada na sessão, então sobrevive à troca de página.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+
+import streamlit as st
+
+# Coluna -> (checkbox "todos", rótulo do multiselect, rótulo no resumo, parâmetro da URL)
+FILTROS = {
+    'CLIENTE': ("Selecionar todos os clientes", "Unidade", "Clientes", "cliente"),
+    'TIPO DE MANUTENÇÃO2': ("Selecionar todos os tipos de manutenção", "Tipo de manutenção", "Tipos de manutenção", "tipo"),
+    'SUPERVISOR': ("Todos os supervisores", "Supervisor", "Supervisores", "supervisor"),
+    'COORDENADOR': ("Todos os coordenadores", "Coordenador", "Coordenadores", "coordenador"),
+    'REGIÃO': ("Todas as regiões", "Região", "Regiões", "regiao"),
+    'CIDADE': ("Todas as cidades", "Cidade", "Cidades", "cidade"),
+    'GRUPO': ("Todos os grupos", "Grupo", "Grupos", "grupo"),
+    'PENDÊNCIAS EM ABERTO': ("Todas as pendências", "Tipo de pendência", "Pendências", "pendencia"),
+}
+
+# Filho -> pai: as opções do filho ficam limitadas aos valores ligados ao que foi escolhido no pai
+# (o pai é sempre montado antes do filho, ver `ordem_cascata`)
+CASCATAS = {
+    'CIDADE': 'REGIÃO',
+    'SUPERVISOR': 'COORDENADOR',
+}
+
+PARAMETRO_INICIO = "de"
+PARAMETRO_FIM = "ate"
+
+# Seleção guardada na sessão (sobrevive à troca de página)
+_CHAVE_SESSAO = "selecao_filtros"
+_CHAVE_PERIODO = "filtro_periodo"
+
+
+@dataclass(frozen=True)
+class OpcoesFiltros:
+    opcoes: dict      # coluna -> valores ordenados
+    filhos: dict      # coluna filha -> {valor do pai: valores do filho}
+    data_min: date
+    data_max: date
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def opcoes_filtros(versao, _consultas, colunas=tuple(FILTROS), cascatas=tuple(CASCATAS.items())):
+    """Opções, mapas das cascatas e limites do período de uma versão dos dados (via motor de consultas)."""
+    opcoes = {col: sorted(map(str, _consultas.distintos([col])[col].dropna().unique())) for col in colunas}
+
+    filhos = {}
+    for filho, pai in cascatas:
+        if filho in colunas and pai in colunas:
+            pares = _consultas.distintos([pai, filho]).dropna().drop_duplicates().astype(str)
+            filhos[filho] = {valor: sorted(grupo[filho]) for valor, grupo in pares.groupby(pai, sort=False)}
+
+    data_min, data_max = _consultas.periodo()
+    return OpcoesFiltros(opcoes, filhos, data_min.date(), data_max.date())
+
+
+def ordem_cascata(colunas):
+    """Colunas na ordem dada, mas com cada pai de CASCATAS antes dos seus filhos."""
+    ordem = []
+
+    def incluir(col):
+        if col in ordem:
+            return
+        pai = CASCATAS.get(col)
+        if pai in colunas:
+            incluir(pai)
+        ordem.append(col)
+
+    for col in colunas:
+        incluir(col)
+    return ordem
+
+
+def _chaves(col):
+    return f"filtro_todos_{col}", f"filtro_{col}"
+
+
+def _selecao_da_url(colunas):
+    """Seleção pedida na URL (só as colunas presentes nela)."""
+    return {
+        col: st.query_params.get_all(FILTROS[col][3])
+        for col in colunas if FILTROS[col][3] in st.query_params
+    }
+
+
+def _atualizar_url(parametros):
+    """Grava os parâmetros dos filtros na URL sem mexer nos demais (ex.: debug)."""
+    nossos = {p for *_, p in FILTROS.values()} | {PARAMETRO_INICIO, PARAMETRO_FIM}
+    atuais = {p: st.query_params.get_all(p) for p in nossos if p in st.query_params}
+    if atuais == parametros:
+        return
+    for p in atuais.keys() - parametros.keys():
+        del st.query_params[p]
+    for p, valores in parametros.items():
+        if atuais.get(p) != valores:
+            st.query_params[p] = valores
+
+
+def _data_da_url(parametro, padrao):
+    try:
+        return date.fromisoformat(st.query_params.get(parametro, ""))
+    except ValueError:
+        return padrao
+
+
+def seletor_periodo(opcoes, rotulo="Período de abertura:"):
+    """Seletor do período de abertura; começa pelo período da URL (ou o completo) e fica nos limites dos dados."""
+    periodo = st.session_state.get(_CHAVE_PERIODO)
+    if periodo is None:
+        periodo = [_data_da_url(PARAMETRO_INICIO, opcoes.data_min), _data_da_url(PARAMETRO_FIM, opcoes.data_max)]
+    st.session_state[_CHAVE_PERIODO] = [min(max(valor, opcoes.data_min), opcoes.data_max) for valor in periodo]
+
+    return st.date_input(rotulo, min_value=opcoes.data_min, max_value=opcoes.data_max, key=_CHAVE_PERIODO)
+
+
+def filtros_sidebar(opcoes, colunas=tuple(FILTROS)):
+    """Widgets de filtro (dentro da sidebar) e a seleção de cada coluna.
+
+    Retorna (selecoes, selecionados): em `selecoes`, None quando a coluna está
+    com "todos" marcado (a dimensão é ignorada pelo índice de filtros); em
+    `selecionados`, os valores escolhidos (ou todas as opções disponíveis).
+    """
+    # Primeira execução da sessão: a seleção vem da URL
+    memoria = st.session_state.setdefault(_CHAVE_SESSAO, _selecao_da_url(colunas))
+
+    selecoes, selecionados = {}, {}
+    with st.expander("🎯 Selecione os filtros"):
+        for col in ordem_cascata(colunas):
+            rotulo_todos, rotulo, _, _ = FILTROS[col]
+            chave_todos, chave = _chaves(col)
+
+            disponiveis = opcoes.opcoes[col]
+            pai = CASCATAS.get(col)
+            if col in opcoes.filhos and selecoes.get(pai) is not None:
+                mapa = opcoes.filhos[col]
+                disponiveis = sorted({v for valor in selecoes[pai] for v in mapa.get(valor, ())})
+
+            # Estado inicial vem da memória da sessão; valores fora das opções saem. As chaves são
+            # regravadas a cada execução: o widget de outra página não herda o estado sozinho
+            lembrado = memoria.get(col)
+            st.session_state[chave_todos] = st.session_state.get(chave_todos, lembrado is None)
+            permitidos = set(disponiveis)
+            valores = st.session_state.get(chave, lembrado or [])
+            st.session_state[chave] = [v for v in valores if v in permitidos]
+
+            todos = st.checkbox(rotulo_todos, key=chave_todos)
+            if todos:
+                selecionados[col], selecoes[col] = disponiveis, None
+            else:
+                selecionados[col] = selecoes[col] = st.multiselect(rotulo, disponiveis, key=chave)
+            memoria[col] = selecoes[col]
+    return selecoes, selecionados
+
+
+def parametros_url(selecoes, data_inicio, data_fim):
+    """Parâmetros da URL que reproduzem a seleção (colunas com "todos" ficam de fora)."""
+    parametros = {FILTROS[col][3]: list(valores) for col, valores in selecoes.items() if valores is not None}
+    parametros[PARAMETRO_INICIO] = [data_inicio.isoformat()]
+    parametros[PARAMETRO_FIM] = [data_fim.isoformat()]
+    return parametros
+
+
+def guardar_selecao(selecoes, data_inicio, data_fim):
+    """Deixa a URL da página igual à seleção atual."""
+    parametros = parametros_url(selecoes, data_inicio, data_fim)
+    _atualizar_url(parametros)
+    return parametros
+
+
+def resumo_filtros(selecionados):
+    with st.expander("📌 Filtros Selecionados"):
+        st.markdown("\n".join(
+            f"- **{FILTROS[col][2]}:** {', '.join(map(str, valores))}" for col, valores in selecionados.items()
+        ))
@@ -1,4 +1,5 @@
 import plotly.graph_objects as go
+import numpy as np
 import pandas as pd
 
 def grafico_kpi(grupo_df, cor_azul, cor_verde, cor_laranja):
@@ -73,3 +74,55 @@ def grafico_evolucao(grupo_df, cor_azul, cor_laranja):
     )
 
     return fig
+
+
+def _segmentos(valores, inicio, preenchimento):
+    """Pares (valores[i], valores[i+1]) dos índices `inicio`, separados por um valor vazio."""
+    valores = np.asarray(valores, dtype=object)
+    vazio = np.full(len(inicio), preenchimento, dtype=object)
+    return np.column_stack([valores[inicio], valores[inicio + 1], vazio]).ravel().tolist()
+
+
+def grafico_tendencia(x, y, cor_subida, cor_queda, empate_como_subida=True):
+    """Linha colorida por tendência mês a mês, com número fixo de traces.
+
+    Cada trecho entre dois pontos leva a cor de subida ou de queda. Os trechos
+    de mesma cor ficam em um único trace, separados por None (lacunas), e os
+    pontos e rótulos num trace à parte; o tamanho da figura não cresce em
+    número de traces com o histórico.
+    """
+    x = np.asarray(x, dtype=object)
+    y_num = np.asarray(y, dtype=float)
+    fig = go.Figure()
+    if len(x) < 2:
+        return fig
+
+    variacao = np.diff(y_num)
+    subiu = variacao >= 0 if empate_como_subida else variacao > 0
+    cores_trecho = np.where(subiu, cor_subida, cor_queda)
+
+    for cor, trechos in ((cor_subida, np.flatnonzero(subiu)), (cor_queda, np.flatnonzero(~subiu))):
+        if len(trechos) == 0:
+            continue
+        fig.add_trace(go.Scatter(
+            x=_segmentos(x, trechos, None),
+            y=_segmentos(y_num, trechos, np.nan),
+            mode='lines',
+            line=dict(color=cor, width=3),
+            hoverinfo='skip',
+            showlegend=False
+        ))
+
+    # Cada ponto leva a cor do trecho que sai dele (o último, a do trecho que chega)
+    cores_ponto = np.append(cores_trecho, cores_trecho[-1])
+    fig.add_trace(go.Scatter(
+        x=x.tolist(),
+        y=y_num.tolist(),
+        mode='markers+text',
+        marker=dict(size=8, color=cores_ponto.tolist()),
+        text=[f"{v}" for v in y],
+        textposition="top center",
+        showlegend=False
+    ))
+
+    return fig
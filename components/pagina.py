@@ -0,0 +1,59 @@
+"""Início comum das páginas do dashboard (app.py e pages/painel_sistemas.py).
+
+Logo, cabeçalho e CSS são lidos e montados uma vez por processo
+(`st.cache_resource`); a cada execução só o HTML pronto é enviado. Os dados
+vêm do atualizador do processo (scripts/leitura_dados.py), compartilhado por
+todas as páginas e sessões, e os filtros da sidebar são os mesmos widgets
+nos dois painéis (components/filtros_sidebar.py). Trocar de página não relê
+dados nem arquivos.
+"""
+
+import base64
+import os
+from dataclasses import dataclass
+
+import streamlit as st
+
+from scripts.leitura_dados import atualizador_dados
+
+# Raiz do projeto (os caminhos não dependem da pasta de onde o Streamlit foi iniciado)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOGO = os.path.join(RAIZ, "assets", "logo.png")
+CABECALHO = os.path.join(RAIZ, "styles", "components.html")
+CSS = os.path.join(RAIZ, "styles", "layout.css")
+
+COR_AZUL = '#1B556B'
+COR_LARANJA = '#E98C5F'
+COR_VERDE = '#32AF9D'
+
+
+@dataclass(frozen=True)
+class AtivosPagina:
+    cabecalho: str  # HTML do cabeçalho com o logo embutido
+    estilo: str     # <style> do layout
+
+
+@st.cache_resource(show_spinner=False)
+def ativos_pagina():
+    """Logo em base64, cabeçalho e CSS, lidos uma vez por processo."""
+    with open(LOGO, "rb") as image_file:
+        logo_base64 = f"data:image/png;base64,{base64.b64encode(image_file.read()).decode()}"
+    with open(CABECALHO, encoding="utf-8") as f:
+        cabecalho = f.read().format(logo_base64=logo_base64)
+    with open(CSS, encoding="utf-8") as f:
+        estilo = f"<style>{f.read()}</style>"
+    return AtivosPagina(cabecalho, estilo)
+
+
+def iniciar_pagina(titulo):
+    """Configura a página e injeta cabeçalho e CSS. Precisa ser o primeiro comando do Streamlit."""
+    st.set_page_config(page_title=titulo, layout="wide")
+    ativos = ativos_pagina()
+    st.markdown(ativos.cabecalho, unsafe_allow_html=True)
+    st.markdown(ativos.estilo, unsafe_allow_html=True)
+
+
+def dados_pagina():
+    """Versão atual dos dados do processo (snapshot, OS válidas e consultas)."""
+    return atualizador_dados().atual()
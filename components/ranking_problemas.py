@@ -0,0 +1,50 @@
+"""Ranking de problemas recorrentes (causas e ocorrências).
+
+A contagem é feita sobre o texto canônico de cada problema (variações de
+acento, pontuação e digitação já unidas na carga).
+
+A tabela é montada uma vez por contagem (e pode ser cacheada pelo painel), com
+o percentual numérico; o destaque de quem passa de LIMIAR_DESTAQUE % do total
+é uma máscara de estilos calculada de uma vez, sem callback por célula.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Percentual do total a partir do qual o problema aparece em destaque
+LIMIAR_DESTAQUE = 10
+
+ESTILO_DESTAQUE = "color: green; font-weight: bold;"
+ESTILO_NORMAL = "color: #888;"
+
+
+def coluna_problema(colunas, coluna):
+    """Coluna com o texto canônico (ver scripts/causas.py) quando os dados a tiverem."""
+    canonica = f"{coluna}_CANONICA"
+    return canonica if canonica in colunas else coluna
+
+
+def tabela_problemas(contagem, titulo_coluna):
+    """Classificação, problema, frequência e % do total a partir da contagem já ordenada."""
+    frequencia = contagem.to_numpy()
+    total = frequencia.sum()
+    return pd.DataFrame({
+        "Classificação": np.arange(1, len(contagem) + 1),
+        titulo_coluna: contagem.index.astype(str),
+        "Frequência": frequencia,
+        "% do Total": (frequencia / total * 100).round(1) if total else np.zeros(len(contagem)),
+    })
+
+
+def mascara_destaque(tabela):
+    """Estilo de cada célula (só a coluna de % é colorida)."""
+    estilos = pd.DataFrame("", index=tabela.index, columns=tabela.columns)
+    estilos["% do Total"] = np.where(tabela["% do Total"] >= LIMIAR_DESTAQUE, ESTILO_DESTAQUE, ESTILO_NORMAL)
+    return estilos
+
+
+def exibir_ranking_problemas(tabela):
+    estilos = mascara_destaque(tabela)
+    styled_df = tabela.style.apply(lambda _: estilos, axis=None).format({"% do Total": "{:.1f}%"})
+    st.dataframe(styled_df, use_container_width=True, hide_index=True)
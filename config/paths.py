@@ -1,7 +1,27 @@
 # config/paths.py
+import os
+import tempfile
 
 # Caminho fixo do Excel (não será alterado)
 EXCEL_PATH = r"C:\Users\matheus.pires\OneDrive - ORBIS ENGENHARIA CLINICA\DADOS POWERBI\Painel Operações - Dados.xlsx"
 
 # Nome da aba a ser lida
 SHEET_NAME = "Dados sistemas fechadas"
+
+# Pasta do snapshot colunar (Parquet) gerado a partir do Excel
+SNAPSHOT_DIR = os.environ.get(
+    "DASHBOARD_SNAPSHOT_DIR",
+    os.path.join(tempfile.gettempdir(), "dashboard_snapshot")
+)
+
+# Rastros (tempo/memória por seção) de cada execução dos painéis, em JSON lines; vazio desativa
+RASTROS_ARQUIVO = os.environ.get(
+    "DASHBOARD_RASTROS",
+    os.path.join(tempfile.gettempdir(), "dashboard_rastros.jsonl")
+)
+
+# Cache dos PDFs de relatório, indexado pelo hash do HTML; vazio desativa
+PDF_CACHE_DIR = os.environ.get(
+    "DASHBOARD_PDF_CACHE",
+    os.path.join(tempfile.gettempdir(), "dashboard_pdf_cache")
+)
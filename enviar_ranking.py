@@ -1,195 +1,223 @@
-import pandas as pd
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-import pdfkit
-import os
-from datetime import datetime
-import locale
-import sys
-import shutil
-
-# 🔁 Definir tipo de métrica usada no relatório
-# Opções: "mesmo_mes" ou "todas_fechadas"
-METRICA = "mesmo_mes"
-
-# Adiciona o diretório 'scripts' ao path do sistema para importar leitura_dados.py
-sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
-from leitura_dados import carregar_dados
+# enviar_ranking.py
 
-# Definir localidade para português do Brasil
-try:
-    locale.setlocale(locale.LC_TIME, 'pt_BR.UTF-8')
-except locale.Error:
-    locale.setlocale(locale.LC_TIME, '')
+"""Envia o relatório de ranking de conclusão de OS por e-mail (HTML + PDF).
 
-# Caminho do executável wkhtmltopdf
-path_wkhtmltopdf = shutil.which("wkhtmltopdf")
-config = pdfkit.configuration(wkhtmltopdf=path_wkhtmltopdf)
+    python enviar_ranking.py                                   # mês atual, destinatário padrão
+    python enviar_ranking.py --meses 2025-07 2025-08 --metrica todas_fechadas
+    python enviar_ranking.py --grupos grupos.json --nao-enviar --saida relatorios/
+    python enviar_ranking.py --para a@orbis.com.br b@orbis.com.br --tipos preventiva calibração
+    python enviar_ranking.py --por COORDENADOR --enderecos coordenadores.json --transporte arquivo
 
-# 🔹 Leitura do banco de dados online
-df = carregar_dados()
+`--grupos` aponta para um JSON com uma lista de grupos:
 
-# 🔹 Filtros iniciais
-df = df[df['CLIENTE'].notna() & (df['CLIENTE'].str.strip() != "-")]
+    [{"nome": "Coordenação 1", "destinatarios": ["x@orbis.com.br"],
+      "filtros": {"COORDENADOR": ["Coordenador 1"]}}]
 
-# 🔹 Filtra por tipo desejado
-tipos_validos = ['calibração', 'preventiva', 'tse', 'qualificação']
-df = df[df['TIPO DE MANUTENÇÃO2'].str.lower().isin(tipos_validos)]
+`--por COLUNA` gera um grupo por valor da coluna (um relatório por
+coordenador, por cliente...), com os destinatários de cada valor lidos de
+`--enderecos` ({"Coordenador 1": ["x@orbis.com.br"], ...}); valores sem
+endereço ficam de fora.
 
-# 🔹 Criar colunas auxiliares para o mês de abertura e fechamento
-df['Mes_Abertura'] = df['Abertura'].dt.to_period('M').astype(str)
-df['Mes_Fechamento'] = df['Fechamento'].dt.to_period('M').astype(str)
+Os PDFs são renderizados em lote por scripts/renderizacao_pdf.py (pool de
+processos, cache pelo hash do HTML e conversor em Python quando não há
+wkhtmltopdf). O envio passa por scripts/envio.py: as mensagens são montadas em paralelo e
+enviadas por conexões SMTP reaproveitadas, com novas tentativas e limite de
+taxa. `--transporte arquivo` grava os .eml em `--pasta-envio` em vez de
+enviar; `--smtp-host localhost --smtp-porta 1025 --sem-tls` aponta para um
+SMTP local de testes (sem login).
 
-# 🔹 Considerar somente OS válidas
-df_validas = df[df['SITUAÇÃO OS'].isin(['Aberta', 'Pendente', 'Fechada'])].copy()
-
-# 🔹 Filtrar apenas OS cujo mês de abertura é o mês atual
-mes_atual = datetime.now().strftime('%Y-%m')
-df_validas_mes_atual = df_validas[df_validas['Mes_Abertura'] == mes_atual]
-
-# 🔹 Total abertas e fechadas conforme métrica
-total_os = df_validas_mes_atual.groupby('CLIENTE')['OS'].count().reset_index(name='Abertas')
-
-if METRICA == "mesmo_mes":
-    df_fechadas = df_validas_mes_atual[
-        (df_validas_mes_atual['SITUAÇÃO OS'] == 'Fechada') &
-        (df_validas_mes_atual['Mes_Abertura'] == df_validas_mes_atual['Mes_Fechamento'])
-    ]
-    metrica_titulo = "Fechadas no mesmo mês"
-else:
-    df_fechadas = df_validas_mes_atual[df_validas_mes_atual['SITUAÇÃO OS'] == 'Fechada']
-    metrica_titulo = "Fechadas no mês (qualquer abertura)"
-
-fechadas = df_fechadas.groupby('CLIENTE')['OS'].count().reset_index(name='Fechadas')
-
-ranking = pd.merge(total_os, fechadas, on='CLIENTE', how='left').fillna(0)
-ranking['% Conclusão'] = (ranking['Fechadas'] / ranking['Abertas']) * 100
-ranking = ranking.sort_values(by='% Conclusão', ascending=False).reset_index(drop=True)
-ranking['Classificação'] = ranking.index + 1
-
-# 🔹 Totais para os cards
-total_abertas = len(df_validas_mes_atual)
-total_fechadas = len(df_fechadas)
-porcentagem_conclusao = (total_fechadas / total_abertas * 100) if total_abertas > 0 else 0
-
-# 🔹 Gerar HTML dos cards e tabela
-meses_pt = {
-    1: 'janeiro', 2: 'fevereiro', 3: 'março', 4: 'abril',
-    5: 'maio', 6: 'junho', 7: 'julho', 8: 'agosto',
-    9: 'setembro', 10: 'outubro', 11: 'novembro', 12: 'dezembro'
-}
-
-agora = datetime.now()
-data_ref = f"{meses_pt[agora.month].capitalize()} de {agora.year}"
-
-html_cards = f"""
-<div style="font-family:'Segoe UI', Tahoma, sans-serif; margin-bottom:30px;">
-  <h2 style="color:#1B556B; font-size:22px;">Relatório Institucional - Desempenho Operacional ({data_ref})</h2>
-  <p style="font-size:15px; color:#333; margin-bottom:20px;">
-    Este relatório apresenta os indicadores de desempenho relacionados às <strong>ordens de serviço abertas e finalizadas no mês atual</strong>, abrangendo as categorias de manutenção <strong>Calibração</strong>, <strong>Preventiva</strong>, <strong>TSE</strong> e <strong>Qualificação</strong>.
-  </p>
-  <p style="font-size:14px; color:#555; font-style:italic;">Departamento de Operações · Orbis Engenharia Clínica</p>
-  <div style="display:flex; gap:15px; flex-wrap:wrap;">
-    <div style="flex:1; min-width:150px; background:#E8F0FE; padding:20px; border-radius:12px; border-left:5px solid #1B556B;">
-      <p style="margin:0; font-size:13px;">Total de OS Abertas</p>
-      <h3 style="margin:0; font-size:22px;">{total_abertas}</h3>
-    </div>
-    <div style="flex:1; min-width:150px; background:#D4EDDA; padding:20px; border-radius:12px; border-left:5px solid #28A745;">
-      <p style="margin:0; font-size:13px;">{metrica_titulo}</p>
-      <h3 style="margin:0; font-size:22px;">{total_fechadas}</h3>
-    </div>
-    <div style="flex:1; min-width:150px; background:#FFF3CD; padding:20px; border-radius:12px; border-left:5px solid #FFC107;">
-      <p style="margin:0; font-size:13px;">% Conclusão</p>
-      <h3 style="margin:0; font-size:22px;">{porcentagem_conclusao:.1f}%</h3>
-    </div>
-  </div>
-</div>
+Os relatórios são montados por scripts/relatorio_ranking.py a partir do
+snapshot Parquet (com `--sem-verificar-origem`, do snapshot já existente,
+sem consultar o Google Drive).
 """
 
-html_tabela = """
-<h3 style='color:#1B556B;'>🏅 Ranking de Conclusão por Cliente</h3>
-<table style="width:100%; border-collapse: separate; border-spacing: 0; font-family: 'Segoe UI', Tahoma, sans-serif;">
-    <thead style="background-color:#1B556B; color:white;">
-        <tr>
-            <th style="padding:12px; border:1px solid #ccc; border-top-left-radius: 10px;">Classificação</th>
-            <th style="padding:12px; border:1px solid #ccc;">Cliente</th>
-            <th style="padding:12px; border:1px solid #ccc;">Abertas</th>
-            <th style="padding:12px; border:1px solid #ccc;">Fechadas</th>
-            <th style="padding:12px; border:1px solid #ccc; border-top-right-radius: 10px;">% Conclusão</th>
-        </tr>
-    </thead>
-    <tbody>
-"""
-
-for _, row in ranking.iterrows():
-    texto = f"<span style='color:#155724;'>✅ {row['% Conclusão']:.1f}%</span>" if row['% Conclusão'] >= 90 else f"<span style='color:#721c24;'>❌ {row['% Conclusão']:.1f}%</span>"
-    html_tabela += f"""
-    <tr style="font-size:14px;">
-        <td style="padding:10px; border:1px solid #ccc; text-align:center;">{int(row['Classificação'])}</td>
-        <td style="padding:10px; border:1px solid #ccc;">{row['CLIENTE']}</td>
-        <td style="padding:10px; border:1px solid #ccc; text-align:center;">{int(row['Abertas'])}</td>
-        <td style="padding:10px; border:1px solid #ccc; text-align:center;">{int(row['Fechadas'])}</td>
-        <td style="padding:10px; border:1px solid #ccc; text-align:center;">{texto}</td>
-    </tr>
-    """
-
-html_tabela += "</tbody></table>"
-
-html_completo = f"""
-<html>
-  <head><meta charset="utf-8"></head>
-  <body style="font-family:'Segoe UI', Tahoma, sans-serif;">
-    {html_cards}
-    {html_tabela}
-    <div style="text-align:center; margin:30px 0;">
-      <a href="https://dashbordoperacional.streamlit.app/" target="_blank" style="background-color:#1B556B; color:white; padding:12px 24px; border-radius:8px; text-decoration:none; font-size:15px; font-weight:bold; font-family:'Segoe UI', sans-serif;">
-        📊 Acessar Dashboard
-      </a>
-    </div>
-    <div style="margin-top:40px; font-size:12px; color:#999; text-align:center;">
-      Desenvolvido por Matheus Pires · Mensagem automática do sistema
-    </div>
-  </body>
-</html>
-"""
-
-# 🔹 Gerar PDF
-pdf_path = r"C:\Users\matheus.pires\Desktop\ranking_OS.pdf"
-pdfkit.from_string(html_completo, pdf_path, configuration=config)
-
-# 🔹 Enviar E-mail
+import argparse
+import json
+import logging
+import os
+import tempfile
+from functools import partial
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
 from email.utils import COMMASPACE
 
-destinatarios = [
-    "matheus.pires@orbisengenharia.com.br"
-]
+from scripts import metricas
+from scripts.envio import MENSAGENS_POR_MINUTO, Mensagem, TransporteArquivo, TransporteSMTP, despachar
+from scripts.renderizacao_pdf import MOTORES, TIMEOUT_PADRAO, renderizar_pdfs
+from scripts.relatorio_ranking import (
+    TIPOS_PADRAO,
+    GrupoDestinatarios,
+    dados_relatorio,
+    gerar_relatorios,
+    mes_atual,
+    mes_de_texto,
+)
+
+logger = logging.getLogger(__name__)
+
+REMETENTE = "matheus.pires@orbisengenharia.com.br"
+DESTINATARIOS_PADRAO = ["matheus.pires@orbisengenharia.com.br"]
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORTA = 587
+
+PASTA_SAIDA = os.path.join(tempfile.gettempdir(), "relatorios_ranking")
+PASTA_ENVIO = os.path.join(tempfile.gettempdir(), "relatorios_ranking_eml")
+
+
+def carregar_grupos(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return [
+            GrupoDestinatarios(g["nome"], tuple(g["destinatarios"]), g.get("filtros", {}))
+            for g in json.load(f)
+        ]
+
+
+def grupos_por(df, coluna, enderecos):
+    """Um grupo por valor de `coluna` que tenha destinatários em `enderecos` (valor -> e-mails)."""
+    valores = sorted(df[coluna].dropna().astype(str).unique())
+    sem_endereco = [valor for valor in valores if not enderecos.get(valor)]
+    if sem_endereco:
+        logger.warning("%d valor(es) de %s sem destinatário: %s", len(sem_endereco), coluna, ", ".join(sem_endereco))
+    return [
+        GrupoDestinatarios(valor, tuple(enderecos[valor]), {coluna: [valor]})
+        for valor in valores if enderecos.get(valor)
+    ]
+
 
-email = MIMEMultipart()
-email['From'] = "matheus.pires@orbisengenharia.com.br"
-email['To'] = COMMASPACE.join(destinatarios)
-email['Subject'] = f"📊 Departamento de Operações - Relatório de Conclusão de OS ({data_ref})"
+def montar_email(relatorio, remetente, caminho_pdf=None):
+    email = MIMEMultipart()
+    email['From'] = remetente
+    email['To'] = COMMASPACE.join(relatorio.grupo.destinatarios)
+    email['Subject'] = relatorio.assunto
+    email.attach(MIMEText(relatorio.html, 'html'))
 
-email.attach(MIMEText(html_completo, 'html'))
+    if caminho_pdf:
+        with open(caminho_pdf, "rb") as f:
+            anexo = MIMEBase('application', 'pdf')
+            anexo.set_payload(f.read())
+        encoders.encode_base64(anexo)
+        anexo.add_header('Content-Disposition', 'attachment', filename='Ranking_OS_Departamento_Operacoes.pdf')
+        email.attach(anexo)
+    return email
 
-# Anexo
-with open(pdf_path, "rb") as f:
-    anexo = MIMEBase('application', 'pdf')
-    anexo.set_payload(f.read())
-    encoders.encode_base64(anexo)
-    anexo.add_header('Content-Disposition', 'attachment', filename='Ranking_OS_Departamento_Operacoes.pdf')
-    email.attach(anexo)
 
-# Verifica variável de ambiente antes de logar
-senha = os.environ.get("EMAIL_SENHA")
-if not senha:
-    raise EnvironmentError("Variável de ambiente EMAIL_SENHA não definida.")
+def gravar_arquivos(relatorios, saida, com_pdf=True, processos=None, motor_pdf=None, timeout_pdf=TIMEOUT_PADRAO):
+    """Grava o HTML de cada relatório e renderiza os PDFs em lote.
 
-with smtplib.SMTP('smtp.gmail.com', 587) as server:
-    server.starttls()
-    server.login("matheus.pires@orbisengenharia.com.br", senha)
-    server.send_message(email, to_addrs=destinatarios)
+    Retorna {nome_arquivo: caminho do PDF}; relatórios cujo PDF falhou ficam de fora.
+    """
+    os.makedirs(saida, exist_ok=True)
+    trabalhos = []
+    for relatorio in relatorios:
+        base = os.path.join(saida, relatorio.nome_arquivo)
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(relatorio.html)
+        trabalhos.append((relatorio.html, base + ".pdf"))
+
+    if not com_pdf:
+        return {}
+    resultado = renderizar_pdfs(trabalhos, processos, motor_pdf, timeout_pdf)
+    prontos = set(resultado.gerados) | set(resultado.do_cache)
+    return {
+        relatorio.nome_arquivo: caminho
+        for relatorio, (_, caminho) in zip(relatorios, trabalhos) if caminho in prontos
+    }
+
+
+def preparar_mensagem(relatorio, remetente, caminho_pdf=None):
+    return Mensagem(montar_email(relatorio, remetente, caminho_pdf), relatorio.grupo.destinatarios)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relatório de ranking de conclusão de OS por e-mail.")
+    parser.add_argument("--meses", nargs="+", type=mes_de_texto, help="Meses de abertura (AAAAMM ou AAAA-MM); padrão: mês atual")
+    parser.add_argument("--metrica", choices=list(metricas.OPCOES_METRICA.values()), default=metricas.METRICA_MESMO_MES)
+    parser.add_argument("--tipos", nargs="+", default=list(TIPOS_PADRAO), help="Tipos de manutenção incluídos")
+    destino = parser.add_mutually_exclusive_group()
+    destino.add_argument("--para", nargs="+", help="Destinatários (um único grupo)")
+    destino.add_argument("--grupos", help="JSON com os grupos de destinatários e seus filtros")
+    destino.add_argument("--por", metavar="COLUNA", help="Um relatório por valor da coluna (ex.: COORDENADOR, CLIENTE)")
+    parser.add_argument("--enderecos", help="JSON valor -> destinatários, usado com --por")
+    parser.add_argument("--saida", default=PASTA_SAIDA, help="Pasta onde o HTML/PDF de cada relatório é gravado")
+    parser.add_argument("--sem-pdf", action="store_true", help="Não gera o PDF anexo")
+    parser.add_argument("--motor-pdf", choices=MOTORES, help="Padrão: wkhtmltopdf se instalado, senão o conversor em Python")
+    parser.add_argument("--processos-pdf", type=int, help="Processos renderizando PDFs (padrão: núcleos da máquina)")
+    parser.add_argument("--timeout-pdf", type=float, default=TIMEOUT_PADRAO, help="Segundos por PDF")
+    parser.add_argument("--nao-enviar", action="store_true", help="Só gera os arquivos, sem enviar e-mails")
+    parser.add_argument("--sem-verificar-origem", action="store_true",
+                        help="Usa o snapshot existente sem consultar a planilha de origem")
+
+    envio = parser.add_argument_group("envio")
+    envio.add_argument("--transporte", choices=["smtp", "arquivo"], default="smtp",
+                       help="smtp envia; arquivo grava os .eml em --pasta-envio")
+    envio.add_argument("--pasta-envio", default=PASTA_ENVIO)
+    envio.add_argument("--smtp-host", default=SMTP_HOST)
+    envio.add_argument("--smtp-porta", type=int, default=SMTP_PORTA)
+    envio.add_argument("--sem-tls", action="store_true", help="Sem STARTTLS nem login (SMTP local de testes)")
+    envio.add_argument("--conexoes", type=int, default=2, help="Conexões SMTP simultâneas")
+    envio.add_argument("--construtores", type=int, default=4, help="Threads montando as mensagens")
+    envio.add_argument("--por-minuto", type=int, default=MENSAGENS_POR_MINUTO, help="Limite de mensagens por minuto (0 = sem limite)")
+    envio.add_argument("--tentativas", type=int, default=4, help="Tentativas por mensagem em erros transitórios")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    if args.por and not args.enderecos:
+        parser.error("--por exige --enderecos")
+
+    meses = args.meses or [mes_atual()]
+    verificar_origem = not args.sem_verificar_origem
+    df = None
+    if args.grupos:
+        grupos = carregar_grupos(args.grupos)
+    elif args.por:
+        df = dados_relatorio(meses, args.tipos, verificar_origem)
+        with open(args.enderecos, encoding="utf-8") as f:
+            grupos = grupos_por(df, args.por, json.load(f))
+    else:
+        grupos = [GrupoDestinatarios("geral", tuple(args.para or DESTINATARIOS_PADRAO))]
+
+    relatorios = gerar_relatorios(meses, grupos, args.metrica, args.tipos, df=df, verificar_origem=verificar_origem)
+    for relatorio in relatorios:
+        print(f"📄 {relatorio.data_ref} · {relatorio.grupo.nome}: {relatorio.resumo.total} OS, "
+              f"{relatorio.resumo.taxa:.1f}% de conclusão")
+
+    pdfs = gravar_arquivos(
+        relatorios, args.saida, not args.sem_pdf, args.processos_pdf, args.motor_pdf, args.timeout_pdf
+    )
+    if args.nao_enviar:
+        print(f"✅ {len(relatorios)} relatório(s) gerado(s) em {args.saida} (sem envio).")
+        return
+
+    tarefas = [
+        partial(preparar_mensagem, relatorio, REMETENTE, pdfs.get(relatorio.nome_arquivo))
+        for relatorio in relatorios
+    ]
 
-print("✅ E-mail enviado com sucesso.")
+    if args.transporte == "arquivo":
+        transporte = TransporteArquivo(args.pasta_envio)
+    elif args.sem_tls:
+        transporte = TransporteSMTP(args.smtp_host, args.smtp_porta, starttls=False)
+    else:
+        # Verifica variável de ambiente antes de logar
+        senha = os.environ.get("EMAIL_SENHA")
+        if not senha:
+            raise EnvironmentError("Variável de ambiente EMAIL_SENHA não definida.")
+        transporte = TransporteSMTP(args.smtp_host, args.smtp_porta, REMETENTE, senha)
+
+    resultado = despachar(
+        tarefas, transporte, construtores=args.construtores, conexoes=args.conexoes,
+        por_minuto=args.por_minuto, tentativas=args.tentativas
+    )
+    print(f"✅ {len(resultado.enviadas)} e-mail(s) enviado(s) em {resultado.segundos:.1f}s "
+          f"({resultado.tentativas} tentativa(s), {resultado.conexoes_abertas} conexão(ões)).")
+    if resultado.falhas:
+        print(f"❌ {len(resultado.falhas)} e-mail(s) não enviado(s).")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import uuid
+
+import streamlit as st
+
+from components.graficos import grafico_evolucao, grafico_kpi
+from components.filtros_sidebar import filtros_sidebar, guardar_selecao, opcoes_filtros, resumo_filtros, seletor_periodo
+from components.pagina import COR_AZUL, COR_LARANJA, COR_VERDE, dados_pagina, iniciar_pagina
+from scripts import metricas
+from scripts.instrumentacao import Rastro
+
+# ✅ Precisa ser o primeiro comando do Streamlit (cabeçalho e CSS vêm do cache do processo)
+iniciar_pagina("Painel Sistemas")
+
+# Filtros da sidebar deste painel (sem pendências)
+FILTROS_SISTEMAS = ['CLIENTE', 'TIPO DE MANUTENÇÃO2', 'SUPERVISOR', 'COORDENADOR', 'REGIÃO', 'CIDADE', 'GRUPO']
+
+# ⏱️ Rastro desta execução: tempo e memória de cada seção (gravado em JSON lines ao final)
+rastro = Rastro(
+    "painel_sistemas",
+    sessao=st.session_state.setdefault('id_sessao', uuid.uuid4().hex),
+    tempos=st.session_state.setdefault('tempos_secoes_sistemas', {})
+)
+
+with st.spinner("Carregando dados..."), rastro.medir("carga"):
+
+    # Mesma versão dos dados do painel principal (carregada uma vez por processo)
+    dados_atuais = dados_pagina()
+    consultas = dados_atuais.consultas
+    rastro.contexto.update(versao=dados_atuais.versao, motor=consultas.motor)
+
+    # Mesmas opções de filtro do painel principal (cacheadas por versão)
+    opcoes = opcoes_filtros(dados_atuais.versao, consultas)
+
+# ✅ Filtros fora da sidebar: Período
+st.markdown("### 📆 Selecione o Período de Abertura")
+intervalo = seletor_periodo(opcoes)
+
+# Verifica se o usuário selecionou duas datas
+if len(intervalo) != 2:
+    st.warning("⚠️ Por favor, selecione um **intervalo válido** com data de início e fim.")
+    st.stop()
+
+data_inicio, data_fim = intervalo
+
+# ✅ Filtros na sidebar
+with st.sidebar, rastro.medir("filtros"):
+    st.header("🔎 Filtros")
+    selecoes, selecionados = filtros_sidebar(opcoes, FILTROS_SISTEMAS)
+
+    # ✅ Mostrar filtros ativos
+    resumo_filtros(selecionados)
+
+st.markdown(
+    f"🗓️ Intervalo selecionado: **{data_inicio.strftime('%d/%m/%Y')}** até **{data_fim.strftime('%d/%m/%Y')}**"
+)
+
+# 🔗 A URL reproduz a seleção
+guardar_selecao(selecoes, data_inicio, data_fim)
+
+# Base agregada (uma passada sobre as linhas) para cards, gráficos e rankings
+with rastro.medir("metricas"):
+    base_cubo = consultas.base(selecoes, data_inicio, data_fim)
+    resultado = metricas.calcular_metricas(base_cubo, metricas.METRICA_MESMO_MES)
+
+# 🔙 Volta ao painel principal sem recarregar a sessão
+st.page_link("app.py", label="Voltar ao Painel Principal", icon="🔙")
+
+# Aqui seguem os filtros e gráficos do painel de sistemas
+
+
+    # Cards
+# 🔄 Atualiza valores com mesma lógica dos gráficos
+with rastro.medir("cards"):
+    total_os = resultado.resumo.total
+    pendentes_total = resultado.resumo.pendentes
+    concluidas_mesmo_mes = resultado.resumo.concluidas
+    taxa = resultado.resumo.taxa_formatada
+
+    # 🔤 Cards
+    st.markdown(f"""
+    <div style="display: flex; flex-wrap: wrap; gap: 1rem; margin-top: 1rem;">
+        <div style="flex: 1; min-width: 180px; background: linear-gradient(135deg, #1B556B, #3e7c91); padding: 1rem; border-radius: 10px; color: white; box-shadow: 2px 2px 6px rgba(0,0,0,0.1);">
+            <div style="font-size: 0.9rem;">🔧 Total de OS</div>
+            <div style="font-size: 1.8rem; font-weight: bold;">{total_os}</div>
+        </div>
+        <div style="flex: 1; min-width: 180px; background: linear-gradient(135deg, #ffc107, #ffcd39); padding: 1rem; border-radius: 10px; color: #333; box-shadow: 2px 2px 6px rgba(0,0,0,0.1);">
+            <div style="font-size: 0.9rem;">⚠️ Pendentes</div>
+            <div style="font-size: 1.8rem; font-weight: bold;">{pendentes_total}</div>
+        </div>
+        <div style="flex: 1; min-width: 180px; background: linear-gradient(135deg, #28a745, #5cd081); padding: 1rem; border-radius: 10px; color: white; box-shadow: 2px 2px 6px rgba(0,0,0,0.1);">
+            <div style="font-size: 0.9rem;">✅ Concluídas (mesmo mês)</div>
+            <div style="font-size: 1.8rem; font-weight: bold;">{concluidas_mesmo_mes}</div>
+        </div>
+        <div style="flex: 1; min-width: 180px; background: linear-gradient(135deg, #6c757d, #adb5bd); padding: 1rem; border-radius: 10px; color: white; box-shadow: 2px 2px 6px rgba(0,0,0,0.1);">
+            <div style="font-size: 0.9rem;">📈 % Conclusão</div>
+            <div style="font-size: 1.8rem; font-weight: bold;">{taxa}</div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+# 📊 KPI - Acompanhamento de Abertura e Fechamento de OS por Mês
+
+with rastro.medir("kpi"):
+    grupo_final_sorted = resultado.mensal
+
+    # Gráfico KPI
+    st.markdown("### 📊 KPI - Acompanhamento de Abertura e Fechamento de OS por Mês")
+    fig_kpi = grafico_kpi(grupo_final_sorted, COR_AZUL, COR_VERDE, COR_LARANJA)
+    st.plotly_chart(fig_kpi, use_container_width=True)
+
+    # Gráfico de Evolução
+    fig_evolucao = grafico_evolucao(grupo_final_sorted, COR_AZUL, COR_LARANJA)
+    st.plotly_chart(fig_evolucao, use_container_width=True)
+
+
+st.markdown("### 🏆 Rankings de % Conclusão")
+
+opcao_ranking = st.radio("Escolha o tipo de ranking:", ["Por Cliente", "Por Tipo de Manutenção"], horizontal=True)
+
+with rastro.medir("rankings"):
+    if opcao_ranking == "Por Cliente":
+        ranking = resultado.rankings['CLIENTE'].copy()
+        ranking['% Conclusão'] = ranking['% Conclusão'].round(1).astype(str) + '%'
+
+        st.dataframe(
+            ranking[['Classificação', 'CLIENTE', 'Abertas', 'Fechadas', '% Conclusão']],
+            use_container_width=True,
+            hide_index=True
+        )
+
+    elif opcao_ranking == "Por Tipo de Manutenção":
+        ranking_tipo = resultado.rankings['TIPO DE MANUTENÇÃO2'].copy()
+        ranking_tipo['% Conclusão'] = ranking_tipo['% Conclusão'].round(1).astype(str) + '%'
+
+        st.dataframe(
+            ranking_tipo[['Classificação', 'TIPO DE MANUTENÇÃO2', 'Abertas', 'Fechadas', '% Conclusão']],
+            use_container_width=True,
+            hide_index=True
+        )
+
+# ⏱️ Fecha o rastro da execução
+rastro.finalizar()
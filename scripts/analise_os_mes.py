@@ -1,8 +1,11 @@
 # scripts/analise_os_mes.py
 
+from scripts.enriquecimento import mes_para_data
+
+
 def calcular_os_por_mes(df):
     """Agrupa os dados e calcula quantidade de OS por mês."""
-    df['Mes_Ano'] = df['Abertura'].dt.to_period('M').astype(str)
-    resumo = df.groupby('Mes_Ano')['OS'].count().reset_index()
+    resumo = df[df['Mes_Abertura'] > 0].groupby('Mes_Abertura')['OS'].count().reset_index()
+    resumo['Mes_Abertura'] = mes_para_data(resumo['Mes_Abertura']).dt.strftime('%Y-%m')
     resumo.columns = ['Mês', 'Quantidade_OS']
     return resumo
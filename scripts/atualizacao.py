@@ -0,0 +1,106 @@
+# scripts/atualizacao.py
+
+"""Atualização dos dados em segundo plano, com troca atômica de versão.
+
+Uma thread do processo verifica a origem a cada `intervalo` segundos e, se o
+arquivo mudou, monta a nova versão completa (snapshot, OS válidas e motor de
+consultas) fora do caminho das requisições. Só então a referência
+para a versão atual é trocada, numa única atribuição: quem já estava com a
+versão anterior termina a execução com ela, e a próxima execução pega a nova.
+Nenhuma requisição espera por download ou parse, exceto a primeira carga do
+processo.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre verificações da origem
+INTERVALO_PADRAO = int(os.environ.get("DASHBOARD_INTERVALO_ATUALIZACAO", 15 * 60))
+
+
+@dataclass(frozen=True)
+class VersaoDados:
+    """Uma versão dos dados e tudo que é derivado dela."""
+
+    versao: str
+    sha256: str
+    df: pd.DataFrame  # OS válidas, a única cópia em memória (None com motor SQL: os dados ficam no banco)
+    consultas: object
+    carregado_em: datetime
+
+
+class AtualizadorDados:
+    """Mantém a versão atual dos dados e a substitui em segundo plano.
+
+    `montar(anterior)` devolve a versão a servir: a própria `anterior` se a
+    origem não mudou, ou uma VersaoDados nova. `podar(versoes)`, se houver, é
+    chamado depois de cada troca com as versões que ainda podem ser lidas (a
+    nova e a anterior) e limpa o resto.
+    """
+
+    def __init__(self, montar, intervalo=INTERVALO_PADRAO, podar=None):
+        self._montar = montar
+        self._podar = podar
+        self.intervalo = intervalo
+        self._atual = None
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self.ultima_verificacao = None
+        self.ultimo_erro = None
+
+    def atual(self):
+        """Versão em uso; só bloqueia na primeira carga do processo."""
+        versao = self._atual
+        if versao is None:
+            with self._trava:
+                if self._atual is None:
+                    self._atual = self._montar(None)
+                    self.ultima_verificacao = datetime.now()
+                versao = self._atual
+        return versao
+
+    def atualizar(self):
+        """Verifica a origem e troca a versão se ela mudou. Retorna True se trocou."""
+        with self._trava:
+            anterior = self._atual
+            nova = self._montar(anterior)
+            self.ultima_verificacao = datetime.now()
+            self.ultimo_erro = None
+            if nova is anterior:
+                return False
+            self._atual = nova
+
+        logger.info("Dados atualizados para a versão %s", nova.versao)
+        if self._podar is not None:
+            try:
+                self._podar([nova.versao, anterior.versao if anterior is not None else None])
+            except OSError:
+                logger.exception("Falha ao remover versões antigas dos dados.")
+        return True
+
+    def _laco(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.atualizar()
+            except Exception as e:
+                # Mantém a versão anterior no ar e tenta de novo no próximo ciclo
+                self.ultimo_erro = e
+                logger.exception("Falha ao atualizar os dados; mantendo a versão atual.")
+
+    def iniciar(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._laco, name="atualizador-dados", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
@@ -0,0 +1,263 @@
+# scripts/benchmark.py
+
+"""Benchmark de ponta a ponta do painel sobre OS sintéticas.
+
+Mede, para cada tamanho de dados, o tempo e o pico de memória (RSS acima do
+início da etapa) de cada etapa que uma sessão do painel percorre:
+
+- leitura: origem sintética (Parquet ou Excel) + esquema + colunas derivadas
+- snapshot: gravação das partições Parquet
+- carga: leitura do snapshot e recorte de OS válidas (o caminho de cada processo)
+- consultas: índice de filtros e cubo mensal (ou tabela SQL)
+- filtro: `base` e contagem de causas para seleções aleatórias da sidebar
+- agregacao: cards, série mensal, rankings, tempo médio, backlog e pendências
+- graficos: figuras Plotly e sua serialização (o que o st.plotly_chart envia)
+- exportacao: linhas do backlog em Excel, CSV e Parquet
+
+Os resultados são acrescentados a um arquivo JSONL (um registro por execução
+e tamanho) e comparados com a execução anterior do mesmo tamanho e motor;
+etapas mais lentas que a tolerância são apontadas como regressão.
+
+    python -m scripts.benchmark --linhas 10k 100k
+    python -m scripts.benchmark --linhas 1m --motor duckdb --falhar-com-regressao
+    python -m scripts.benchmark --linhas 100k --origem xlsx
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from components.graficos import grafico_evolucao, grafico_kpi, grafico_tendencia
+from scripts import metricas
+from scripts.compartilhado import somente_leitura
+from scripts.consultas import MOTOR_PANDAS, criar_consultas
+from scripts.enriquecimento import enriquecer
+from scripts.esquema import aplicar_esquema
+from scripts.exportacao import FORMATOS_EXPORTACAO, colunas_backlog, exportar
+from scripts.filtros import DIMENSOES_FILTRO
+from scripts.instrumentacao import PicoMemoria
+from scripts.leitor_excel import ler_aba_os
+from scripts.leitura_dados import os_validas
+from scripts.sintetico import LIMITE_LINHAS_EXCEL, gerar_os, gravar_parquet, gravar_planilha, ler_parquet, numero_linhas
+from scripts.snapshot import chave_snapshot, ler_snapshot, salvar_snapshot
+
+ARQUIVO_RESULTADOS = os.path.join("benchmarks", "resultados.jsonl")
+
+# Etapa mais lenta que a anterior além desta fração conta como regressão
+TOLERANCIA_PADRAO = 0.2
+
+CORES = ("#1B556B", "#28a745", "#fd7e14")
+
+
+def arquivo_sintetico(linhas, semente=0, formato="parquet", pasta=None):
+    """Caminho das OS sintéticas no formato pedido, gerando o arquivo se ainda não existir."""
+    pasta = pasta or tempfile.gettempdir()
+    caminho = os.path.join(pasta, f"os_sintetico_{linhas}_{semente}.{formato}")
+    if not os.path.exists(caminho):
+        inicio = time.perf_counter()
+        temporario = f"{caminho}.tmp.{formato}"
+        if formato == "xlsx":
+            gravar_planilha(gerar_os(linhas, semente), temporario)
+        else:
+            gravar_parquet(temporario, linhas, semente)
+        os.replace(temporario, caminho)
+        print(f"📄 OS sintéticas geradas em {time.perf_counter() - inicio:.1f}s: {caminho}")
+    return caminho
+
+
+def selecoes_aleatorias(df, quantidade, semente=0):
+    """Seleções como as da sidebar: algumas dimensões restritas e um período aleatório."""
+    rng = np.random.default_rng(semente)
+    meses = pd.period_range(df['Abertura'].min(), df['Abertura'].max(), freq='M')
+    casos = []
+    for _ in range(quantidade):
+        selecoes = {col: None for col in DIMENSOES_FILTRO}
+        for col in rng.choice(DIMENSOES_FILTRO, rng.integers(0, 3), replace=False):
+            valores = df[col].cat.categories
+            selecoes[col] = list(rng.choice(valores, min(len(valores), rng.integers(1, 6)), replace=False))
+
+        inicio, fim = sorted(rng.choice(len(meses), 2))
+        data_inicio = meses[inicio].start_time.date()
+        # Metade dos períodos termina no meio do mês (fora do caminho rápido do cubo)
+        data_fim = (meses[fim].end_time if rng.random() < 0.5 else meses[fim].start_time + pd.Timedelta(days=14)).date()
+        casos.append((selecoes, data_inicio, data_fim))
+    return casos
+
+
+def _figuras(base, metrica):
+    mensal = metricas.serie_mensal(base, metrica)
+    tempo = metricas.tempo_medio_mensal(base)
+    backlog = metricas.backlog_mensal(base)
+    return [
+        grafico_kpi(mensal, *CORES),
+        grafico_evolucao(mensal, CORES[0], CORES[2]),
+        grafico_tendencia(tempo['Mes_Ano'].tolist(), tempo['Tempo (dias)'].tolist(), "#dc3545", "#28a745"),
+        grafico_tendencia(backlog['Mes_Ano'].tolist(), backlog['Backlog'].tolist(), "#dc3545", "#28a745",
+                          empate_como_subida=False),
+    ]
+
+
+def _agregar(base):
+    for metrica in metricas.OPCOES_METRICA.values():
+        metricas.calcular_metricas(base, metrica)
+    metricas.tempo_medio_mensal(base)
+    metricas.backlog_mensal(base)
+    metricas.ranking_pendencias(base)
+
+
+def executar(linhas, semente=0, origem="parquet", motor=MOTOR_PANDAS, selecoes=20, pasta=None):
+    """Roda todas as etapas para um tamanho de dados e devolve o registro da execução."""
+    caminho = arquivo_sintetico(linhas, semente, origem, pasta)
+    pasta_snapshot = tempfile.mkdtemp(prefix="benchmark_snapshot_")
+    etapas = {}
+
+    def medir(etapa, funcao, operacoes=1):
+        with PicoMemoria() as memoria:
+            inicio = time.perf_counter()
+            resultado = funcao()
+            segundos = time.perf_counter() - inicio
+        etapas[etapa] = {'segundos': round(segundos, 4), 'pico_mb': memoria.mb, 'operacoes': operacoes}
+        print(f"  {etapa:<11} {segundos:9.3f}s  {memoria.mb:8.1f} MB")
+        return resultado
+
+    def ler_origem(caminho_origem):
+        bruto = ler_aba_os(caminho_origem) if origem == "xlsx" else ler_parquet(caminho_origem)
+        return enriquecer(aplicar_esquema(bruto))
+
+    print(f"▶️ {linhas} linhas ({origem}, motor {motor})")
+    tratado = medir('leitura', lambda: ler_origem(caminho))
+    chave = chave_snapshot(f"sintetico-{linhas}-{semente}")
+    medir('snapshot', lambda: salvar_snapshot(tratado, chave, pasta_snapshot))
+    del tratado
+
+    df = medir('carga', lambda: somente_leitura(os_validas(somente_leitura(ler_snapshot(chave, pasta_snapshot)))))
+    consultas = medir('consultas', lambda: criar_consultas(df, motor))
+
+    casos = selecoes_aleatorias(df, selecoes, semente)
+    bases = medir('filtro', lambda: [
+        (consultas.base(*caso), consultas.contagem('CAUSA', *caso))[0] for caso in casos
+    ], operacoes=len(casos))
+    medir('agregacao', lambda: [_agregar(base) for base in bases], operacoes=len(bases))
+    medir('graficos', lambda: [
+        figura.to_json() for base in bases for figura in _figuras(base, metricas.METRICA_MESMO_MES)
+    ], operacoes=len(bases))
+
+    # Exportação do backlog da seleção completa, o maior arquivo que o painel gera
+    todas = {col: None for col in DIMENSOES_FILTRO}
+    periodo = (df['Abertura'].min().date(), df['Abertura'].max().date())
+
+    def exportar_backlog():
+        backlog = colunas_backlog(consultas.linhas(todas, *periodo, situacoes=metricas.STATUS_PENDENTES))
+        return [len(exportar(backlog, formato)) for formato in FORMATOS_EXPORTACAO]
+
+    medir('exportacao', exportar_backlog, operacoes=len(FORMATOS_EXPORTACAO))
+    shutil.rmtree(pasta_snapshot, ignore_errors=True)
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_atual(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'linhas': linhas,
+        'semente': semente,
+        'origem': origem,
+        'motor': consultas.motor,
+        'etapas': etapas,
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def carregar_resultados(arquivo=ARQUIVO_RESULTADOS):
+    if not os.path.exists(arquivo):
+        return []
+    with open(arquivo, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def salvar_resultado(registro, arquivo=ARQUIVO_RESULTADOS):
+    os.makedirs(os.path.dirname(arquivo) or ".", exist_ok=True)
+    with open(arquivo, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def execucao_anterior(resultados, registro):
+    """Última execução com o mesmo tamanho, semente, origem e motor."""
+    chave = ('linhas', 'semente', 'origem', 'motor')
+    anteriores = [r for r in resultados if all(r.get(c) == registro[c] for c in chave)]
+    return anteriores[-1] if anteriores else None
+
+
+def comparar(registro, anterior, tolerancia=TOLERANCIA_PADRAO):
+    """Tabela etapa a etapa contra a execução anterior (razão > 1 = mais lento)."""
+    linhas = []
+    for etapa, atual in registro['etapas'].items():
+        antes = (anterior or {}).get('etapas', {}).get(etapa)
+        razao = atual['segundos'] / antes['segundos'] if antes and antes['segundos'] else None
+        linhas.append({
+            'Etapa': etapa,
+            'Segundos': atual['segundos'],
+            'Anterior (s)': antes['segundos'] if antes else None,
+            'Razão': round(razao, 2) if razao else None,
+            'Pico (MB)': atual['pico_mb'],
+            'Pico anterior (MB)': antes['pico_mb'] if antes else None,
+            'Regressão': bool(razao and razao > 1 + tolerancia),
+        })
+    return pd.DataFrame(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta do painel com OS sintéticas.")
+    parser.add_argument("--linhas", nargs="+", type=numero_linhas, default=[10_000, 100_000],
+                        help="Tamanhos (número ou 10k/100k/1m/10m)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--origem", choices=["parquet", "xlsx"], default="parquet")
+    parser.add_argument("--motor", default=MOTOR_PANDAS, help="pandas, duckdb ou sqlite")
+    parser.add_argument("--selecoes", type=int, default=20, help="Seleções da sidebar simuladas por tamanho")
+    parser.add_argument("--pasta", help="Pasta dos arquivos sintéticos (padrão: temporária)")
+    parser.add_argument("--resultados", default=ARQUIVO_RESULTADOS, help="Arquivo JSONL com o histórico")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    parser.add_argument("--nao-salvar", action="store_true", help="Só compara, sem gravar no histórico")
+    parser.add_argument("--falhar-com-regressao", action="store_true", help="Sai com código 1 se houver regressão")
+    args = parser.parse_args(argv)
+
+    historico = carregar_resultados(args.resultados)
+    houve_regressao = False
+    for linhas in args.linhas:
+        if args.origem == "xlsx" and linhas > LIMITE_LINHAS_EXCEL:
+            print(f"⚠️ {linhas} linhas não cabem numa aba do Excel; use --origem parquet.")
+            continue
+
+        registro = executar(linhas, args.semente, args.origem, args.motor, args.selecoes, args.pasta)
+        tabela = comparar(registro, execucao_anterior(historico, registro), args.tolerancia)
+        print(tabela.to_string(index=False))
+        houve_regressao |= bool(tabela['Regressão'].any())
+
+        if not args.nao_salvar:
+            salvar_resultado(registro, args.resultados)
+            historico.append(registro)
+
+    if houve_regressao:
+        print("❌ Há etapas mais lentas que a execução anterior além da tolerância.")
+        if args.falhar_com_regressao:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# scripts/benchmark_leitura.py
+
+"""Compara os motores de leitura do Excel numa planilha sintética.
+
+    python -m scripts.benchmark_leitura --linhas 100000
+    python -m scripts.benchmark_leitura --linhas 1000000 --motores calamine openpyxl_streaming
+
+A planilha é gerada uma vez por número de linhas/semente e reaproveitada.
+A linha "openpyxl (todas as colunas)" é o caminho antigo, sem projeção.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from config.paths import SHEET_NAME
+from scripts.benchmark import arquivo_sintetico
+from scripts.leitor_excel import MOTOR_CALAMINE, MOTORES, ler_aba_os, python_calamine
+from scripts.sintetico import numero_linhas
+
+
+def planilha_sintetica(linhas, semente=0, pasta=None):
+    """Caminho da planilha sintética, gerando-a se ainda não existir."""
+    return arquivo_sintetico(linhas, semente, "xlsx", pasta)
+
+
+def medir_leitura(funcao, repeticoes=1):
+    """Menor tempo (s) entre as repetições e o último DataFrame lido."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        df = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), df
+
+
+def comparar_motores(caminho, motores=MOTORES, repeticoes=1, incluir_sem_projecao=True):
+    """Tempo de leitura de cada motor (DataFrame com motor, segundos, linhas/s, colunas)."""
+    casos = []
+    if incluir_sem_projecao:
+        casos.append(("openpyxl (todas as colunas)",
+                      lambda: pd.read_excel(caminho, sheet_name=SHEET_NAME, engine="openpyxl")))
+    for motor in motores:
+        if motor == MOTOR_CALAMINE and python_calamine is None:
+            print("⚠️ python-calamine não instalado; motor calamine ignorado.")
+            continue
+        casos.append((motor, lambda motor=motor: ler_aba_os(caminho, motor)))
+
+    resultados = []
+    for nome, funcao in casos:
+        segundos, df = medir_leitura(funcao, repeticoes)
+        resultados.append({
+            'Motor': nome,
+            'Segundos': round(segundos, 2),
+            'Linhas/s': int(len(df) / segundos) if segundos else 0,
+            'Colunas': len(df.columns),
+        })
+    return pd.DataFrame(resultados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos motores de leitura do Excel.")
+    parser.add_argument("--linhas", type=numero_linhas, default=100_000)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--motores", nargs="+", default=MOTORES, choices=MOTORES)
+    parser.add_argument("--pasta", help="Pasta da planilha sintética (padrão: temporária)")
+    args = parser.parse_args(argv)
+
+    caminho = planilha_sintetica(args.linhas, args.semente, args.pasta)
+    resultados = comparar_motores(caminho, args.motores, args.repeticoes)
+    print(resultados.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
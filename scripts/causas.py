@@ -0,0 +1,212 @@
+# scripts/causas.py
+
+"""Dicionário de causas/ocorrências canônicas para os textos livres da planilha.
+
+CAUSA e OCORRÊNCIA são digitadas à mão, então o mesmo problema aparece como
+"bateria descarregada", "Bateria  descarregada.", "bateria descaregada"...
+Na carga (scripts/enriquecimento.py) cada texto distinto é ligado a um texto
+canônico, em duas etapas:
+
+1. chave dobrada: sem acentos, minúsculas, pontuação trocada por espaço e
+   espaços colapsados; textos com a mesma chave são o mesmo problema
+2. similaridade: as chaves são comparadas por trigramas de caracteres. Para
+   não comparar todas contra todas, cada chave recebe uma assinatura MinHash e
+   só as que caem no mesmo balde em alguma faixa do LSH viram candidatas; as
+   candidatas com Jaccard >= LIMIAR_SIMILARIDADE são unidas
+
+O texto canônico de cada grupo é a forma mais frequente dele (sem pontuação
+nas pontas). O resultado vai para o snapshot como coluna categórica
+(`<coluna>_CANONICA`): no Parquet e em memória ela é um código inteiro por
+linha mais o dicionário de textos, e o ranking de problemas só conta códigos.
+
+Grupos formados nos dados atuais:
+
+    python -m scripts.causas CAUSA
+"""
+
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Jaccard mínimo entre os trigramas de duas chaves para serem o mesmo problema
+LIMIAR_SIMILARIDADE = 0.7
+
+# Assinatura MinHash: FAIXAS x LINHAS_POR_FAIXA valores (limiar do LSH ≈ (1/FAIXAS) ** (1/LINHAS_POR_FAIXA))
+FAIXAS = 16
+LINHAS_POR_FAIXA = 4
+
+_PONTUACAO_PONTAS = ' .,;:!?-'
+
+_SEMENTE = 20250801
+_MASCARA_32 = np.uint64(0xFFFFFFFF)
+
+# Chaves processadas por vez no cálculo das assinaturas (limita a memória)
+_BLOCO_ASSINATURAS = 20_000
+
+# Baldes maiores que isso comparam cada chave só com o representante do balde (não todos contra todos)
+_BALDE_COMPLETO = 32
+
+
+def dobrar_texto(texto):
+    """Chave do texto: sem acentos, minúsculas, só letras/dígitos e espaços simples."""
+    sem_acentos = ''.join(c for c in unicodedata.normalize('NFKD', str(texto)) if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', sem_acentos.lower()).split())
+
+
+def trigramas(chave):
+    """Trigramas de caracteres de cada palavra (com bordas), independentes da ordem das palavras."""
+    return {f" {palavra} "[i:i + 3] for palavra in chave.split() for i in range(len(palavra))}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def assinaturas_minhash(conjuntos, tamanho=FAIXAS * LINHAS_POR_FAIXA, semente=_SEMENTE):
+    """Matriz (conjuntos x tamanho) com os mínimos de `tamanho` funções de hash sobre cada conjunto."""
+    rng = np.random.default_rng(semente)
+    a = rng.integers(1, 1 << 32, tamanho, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 32, tamanho, dtype=np.uint64)
+
+    resultado = np.full((len(conjuntos), tamanho), np.iinfo(np.uint32).max, dtype=np.uint32)
+    for inicio in range(0, len(conjuntos), _BLOCO_ASSINATURAS):
+        bloco = conjuntos[inicio:inicio + _BLOCO_ASSINATURAS]
+        tamanhos = np.fromiter((len(c) for c in bloco), dtype=np.int64, count=len(bloco))
+        if not tamanhos.sum():
+            continue
+        valores = np.fromiter(
+            (zlib.crc32(g.encode('utf-8')) for c in bloco for g in c), dtype=np.uint64, count=int(tamanhos.sum())
+        )
+        hashes = ((valores[:, None] * a + b) & _MASCARA_32).astype(np.uint32)
+
+        # Mínimo por conjunto (conjuntos vazios ficam com o valor máximo)
+        com_itens = np.flatnonzero(tamanhos)
+        posicoes = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))[com_itens]
+        resultado[inicio + com_itens] = np.minimum.reduceat(hashes, posicoes, axis=0)
+    return resultado
+
+
+def pares_candidatos(assinaturas, faixas=FAIXAS, linhas_por_faixa=LINHAS_POR_FAIXA):
+    """Pares (i, j), i < j, que coincidem em todas as linhas de pelo menos uma faixa.
+
+    Em baldes grandes (muitas variações do mesmo texto) cada chave é pareada
+    só com o representante do balde, a de menor índice (`canonizar` ordena
+    as chaves pela frequência, então é a mais comum); o resultado não
+    depende da ordem das demais. Duas
+    variações parecidas entre si mas não com o representante só se unem se
+    caírem juntas em outra faixa, então nesses baldes o agrupamento é de
+    melhor esforço.
+    """
+    pares = set()
+    for faixa in range(faixas):
+        trecho = np.ascontiguousarray(assinaturas[:, faixa * linhas_por_faixa:(faixa + 1) * linhas_por_faixa])
+        _, baldes = np.unique(trecho.view(np.dtype((np.void, trecho.dtype.itemsize * linhas_por_faixa))).ravel(),
+                              return_inverse=True)
+        ordem = np.argsort(baldes, kind='stable')
+        ordenados = baldes[ordem]
+
+        # Cada chave com o representante do seu balde (a ordenação estável o deixa no início)
+        representantes = ordem[np.searchsorted(ordenados, ordenados)]
+        outros = representantes != ordem
+        pares.update(zip(representantes[outros].tolist(), ordem[outros].tolist()))
+
+        # Baldes pequenos: todos os pares
+        tamanhos = np.bincount(baldes)
+        pequenos = np.flatnonzero((tamanhos > 2) & (tamanhos <= _BALDE_COMPLETO))
+        for balde, inicio in zip(pequenos.tolist(), np.searchsorted(ordenados, pequenos).tolist()):
+            membros = ordem[inicio:inicio + tamanhos[balde]].tolist()
+            pares.update((i, j) for k, i in enumerate(membros) for j in membros[k + 1:])
+    return pares
+
+
+class _Conjuntos:
+    """Union-find sobre índices 0..n-1."""
+
+    def __init__(self, n):
+        self.pai = list(range(n))
+
+    def raiz(self, i):
+        while self.pai[i] != i:
+            self.pai[i] = self.pai[self.pai[i]]
+            i = self.pai[i]
+        return i
+
+    def unir(self, i, j):
+        ri, rj = self.raiz(i), self.raiz(j)
+        if ri != rj:
+            self.pai[max(ri, rj)] = min(ri, rj)
+
+
+def canonizar(contagem, limiar=LIMIAR_SIMILARIDADE):
+    """Texto canônico de cada texto distinto.
+
+    `contagem` é uma Series texto -> quantidade de linhas; a saída é uma Series
+    com o mesmo índice e o texto canônico de cada um (a forma mais frequente
+    do grupo).
+    """
+    ordem_original = contagem.index
+    # Mais frequentes primeiro: o representante de cada balde do LSH é a forma mais comum
+    contagem = contagem.sort_values(ascending=False, kind='stable')
+    textos = contagem.index.astype(str)
+    chaves = pd.Series([dobrar_texto(t) for t in textos], index=contagem.index)
+
+    # 1) Mesma chave dobrada; 2) chaves parecidas (LSH + Jaccard dos trigramas)
+    distintas = pd.unique(chaves.to_numpy())
+    posicao = {chave: i for i, chave in enumerate(distintas)}
+    conjuntos = [trigramas(chave) for chave in distintas]
+    grupos = _Conjuntos(len(distintas))
+    for i, j in sorted(pares_candidatos(assinaturas_minhash(conjuntos))):
+        if grupos.raiz(i) != grupos.raiz(j) and jaccard(conjuntos[i], conjuntos[j]) >= limiar:
+            grupos.unir(i, j)
+
+    # Canônico: a forma mais frequente do grupo, sem pontuação nas pontas (texto só de pontuação fica como está)
+    grupo = chaves.map(lambda chave: grupos.raiz(posicao[chave]))
+    aparados = textos.str.strip(_PONTUACAO_PONTAS)
+    tabela = pd.DataFrame({
+        'texto': aparados.where(aparados != '', textos), 'qtd': contagem.to_numpy(), 'grupo': grupo.to_numpy()
+    })
+    tabela = tabela.groupby(['grupo', 'texto'], as_index=False, sort=False)['qtd'].sum()
+    canonicos = (
+        tabela.sort_values(['qtd', 'texto'], ascending=[False, True], kind='stable')
+        .drop_duplicates('grupo')
+        .set_index('grupo')['texto']
+    )
+    return pd.Series(canonicos.reindex(grupo).to_numpy(), index=contagem.index).reindex(ordem_original)
+
+
+def dicionario_canonico(serie, limiar=LIMIAR_SIMILARIDADE):
+    """{texto: texto canônico} para os valores de uma coluna categórica, pesados pela contagem dos códigos."""
+    codigos = serie.cat.codes.to_numpy()
+    contagem = pd.Series(
+        np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories)),
+        index=serie.cat.categories
+    )
+    return canonizar(contagem, limiar).to_dict()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from scripts.snapshot import ler_snapshot, snapshot_atual
+
+    parser = argparse.ArgumentParser(description="Grupos de textos unidos na canonização (a partir do snapshot atual).")
+    parser.add_argument("coluna", nargs="?", default="CAUSA", choices=["CAUSA", "OCORRÊNCIA"])
+    parser.add_argument("--limiar", type=float, default=LIMIAR_SIMILARIDADE)
+    args = parser.parse_args()
+
+    chave = snapshot_atual()
+    if chave is None:
+        raise SystemExit("Nenhum snapshot encontrado; rode python -m scripts.snapshot antes.")
+    serie = ler_snapshot(chave)[args.coluna]
+    contagem = serie.value_counts()
+    canonicos = canonizar(contagem, args.limiar)
+
+    print(f"{len(contagem)} textos distintos -> {canonicos.nunique()} canônicos")
+    for canonico, membros in contagem.groupby(canonicos.to_numpy(), sort=False):
+        if len(membros) > 1:
+            print(f"\n{canonico} ({membros.sum()})")
+            for texto, qtd in membros.sort_values(ascending=False).items():
+                print(f"    {qtd:>8}  {texto}")
@@ -0,0 +1,101 @@
+# scripts/compartilhado.py
+
+"""Dataset único e somente leitura, compartilhado por todas as sessões.
+
+O DataFrame de OS fica em `st.cache_resource` (um objeto por processo, sem
+cópia por sessão) e todos os seus arrays são marcados como não graváveis:
+qualquer tentativa de alterar os dados compartilhados no lugar levanta
+ValueError, enquanto filtros, groupbys e `.copy()` continuam gerando objetos
+novos normalmente. Também mede a memória residente do processo e quantas
+sessões estão usando o painel, para estimar o custo de cada sessão.
+"""
+
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.esquema import memoria_mb
+
+# Sessões sem atividade há mais tempo que isso deixam de contar
+SESSAO_INATIVA_SEGUNDOS = 30 * 60
+
+
+def _array_somente_leitura(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        codigos.flags.writeable = False
+        return pd.Categorical.from_codes(codigos, dtype=serie.dtype)
+
+    valores = serie.to_numpy(copy=False)
+    if isinstance(valores, np.ndarray) and valores.dtype == serie.dtype:
+        valores.flags.writeable = False
+        return valores
+
+    # Outros tipos de extensão ficam como estão (não têm array numpy exposto)
+    return serie.array
+
+
+def somente_leitura(df):
+    """DataFrame que usa os mesmos dados de `df`, com os arrays protegidos contra escrita."""
+    # Medida antes de proteger: memory_usage(deep=True) não aceita arrays de objetos somente leitura
+    memoria = memoria_mb(df)
+
+    colunas = {col: _array_somente_leitura(df[col]) for col in df.columns}
+    protegido = pd.DataFrame(colunas, index=df.index, copy=False)
+    protegido.attrs.update(df.attrs)
+    protegido.attrs['memoria_dados_mb'] = round(memoria, 1)
+    return protegido
+
+
+def memoria_residente_mb():
+    """Memória residente (RSS) atual do processo; fora do Linux, o pico."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource  # não existe no Windows
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em bytes no macOS e em KB nos demais
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+class RegistroSessoes:
+    """Sessões ativas no processo (id -> último acesso)."""
+
+    def __init__(self):
+        self._ultimo_acesso = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, id_sessao):
+        agora = time.time()
+        with self._trava:
+            self._ultimo_acesso[id_sessao] = agora
+            limite = agora - SESSAO_INATIVA_SEGUNDOS
+            for id_antigo in [i for i, t in self._ultimo_acesso.items() if t < limite]:
+                del self._ultimo_acesso[id_antigo]
+            return len(self._ultimo_acesso)
+
+
+def relatorio_memoria(df_compartilhado, sessoes_ativas):
+    """Memória do processo, do dataset compartilhado e uma estimativa por sessão (MB).
+
+    A estimativa por sessão é só o que sobra do processo além dos dados,
+    dividido pelas sessões ativas (inclui bibliotecas, caches e o cubo).
+    Sem DataFrame (motor SQL), os dados no banco entram nessa sobra.
+    """
+    processo = memoria_residente_mb()
+    dados = df_compartilhado.attrs.get('memoria_dados_mb', 0) if df_compartilhado is not None else 0
+    sessoes = max(sessoes_ativas, 1)
+    return {
+        'processo_mb': round(processo, 1),
+        'dados_compartilhados_mb': round(dados, 1),
+        'sessoes_ativas': sessoes_ativas,
+        'por_sessao_mb': round(max(processo - dados, 0) / sessoes, 1),
+    }
@@ -0,0 +1,242 @@
+# scripts/consultas.py
+
+"""Consultas do painel com motor plugável: pandas (padrão), DuckDB ou SQLite.
+
+Todos os motores respondem às mesmas perguntas e devolvem só resultados
+pequenos:
+
+- base: agregado no formato do cubo (ver scripts/cubo.py), entrada de scripts/metricas.py
+- contagem: quantidade de OS por valor de uma coluna (problemas recorrentes)
+- linhas: as OS da seleção, só quando alguém pede a exportação
+- distintos/periodo: valores das colunas e limites de abertura (opções dos filtros)
+
+No motor pandas a seleção é resolvida pelo índice de filtros e pelo cubo
+mensal. Nos motores SQL a tabela de OS é carregada uma vez por versão dos
+dados e filtros e agrupamentos viram SQL; depois disso o processo não guarda
+o DataFrame (ver scripts/leitura_dados.py), os dados ficam só no banco. O motor é escolhido pela variável DASHBOARD_MOTOR
+('pandas', 'duckdb' ou 'sqlite'); se o DuckDB não estiver instalado, cai
+para o pandas.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from scripts.cubo import CuboMensal, DIMENSOES_CUBO, MEDIDAS, construir_cubo
+from scripts.esquema import COLUNAS_DATA
+from scripts.filtros import IndiceFiltros
+
+try:
+    import duckdb
+except ImportError:  # motor opcional
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+MOTOR_PANDAS = "pandas"
+MOTOR_DUCKDB = "duckdb"
+MOTOR_SQLITE = "sqlite"
+
+
+def normalizar_contagem(contagem):
+    """Junta valores que só diferem por espaços/maiúsculas e ordena pela frequência."""
+    rotulos = contagem.index.astype(str).str.strip().str.lower()
+    contagem = contagem.groupby(rotulos).sum()
+    contagem = contagem[contagem > 0]
+    return contagem.sort_values(ascending=False, kind='stable')
+
+
+def contar_valores(serie):
+    """Quantidade de linhas por valor; em colunas categóricas, contagem direta dos códigos."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        contagem = np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories))
+        return pd.Series(contagem, index=serie.cat.categories)
+    return serie.value_counts(sort=False)
+
+
+class ConsultasPandas:
+    """Consultas sobre o DataFrame em memória (índice de filtros + cubo mensal)."""
+
+    motor = MOTOR_PANDAS
+
+    def __init__(self, df, cubo=None):
+        self.df = df
+        self.colunas = list(df.columns)
+        self.indice = IndiceFiltros(df)
+        self.cubo = cubo or CuboMensal(df)
+
+    def _filtrar(self, selecoes, data_inicio, data_fim):
+        return self.indice.aplicar(self.df, selecoes, data_inicio, data_fim)
+
+    def base(self, selecoes, data_inicio, data_fim):
+        base = self.cubo.recortar(selecoes, data_inicio, data_fim)
+        if base is None:
+            base = construir_cubo(self._filtrar(selecoes, data_inicio, data_fim))
+        return base
+
+    def contagem(self, coluna, selecoes, data_inicio, data_fim):
+        serie = self._filtrar(selecoes, data_inicio, data_fim)[coluna]
+        return normalizar_contagem(contar_valores(serie))
+
+    def linhas(self, selecoes, data_inicio, data_fim, situacoes=None):
+        df = self._filtrar(selecoes, data_inicio, data_fim)
+        if situacoes is not None:
+            df = df[df['SITUAÇÃO OS'].isin(situacoes)]
+        return df
+
+    def distintos(self, colunas):
+        """Combinações distintas dos valores das colunas (inclusive nulos)."""
+        return self.df[list(colunas)].drop_duplicates().reset_index(drop=True)
+
+    def periodo(self):
+        """Menor e maior data de abertura."""
+        return self.df['Abertura'].min(), self.df['Abertura'].max()
+
+
+def _coluna(nome):
+    return '"' + nome.replace('"', '""') + '"'
+
+
+class ConsultasSQL:
+    """Consultas em um banco embutido (DuckDB ou SQLite) com a tabela de OS."""
+
+    def __init__(self, df, motor=MOTOR_DUCKDB):
+        self.motor = motor
+        self.colunas = list(df.columns)
+        self._trava = threading.Lock()
+
+        tabela = df.reset_index(drop=True)
+        tabela.insert(0, '_linha', range(len(tabela)))
+
+        if motor == MOTOR_DUCKDB:
+            self._conexao = duckdb.connect()
+            self._conexao.register('os_origem', tabela)
+            self._conexao.execute("CREATE TABLE os AS SELECT * FROM os_origem")
+            self._conexao.unregister('os_origem')
+        else:
+            # SQLite não tem categorias nem datas: texto e ISO 8601
+            for col in tabela.columns:
+                if isinstance(tabela[col].dtype, pd.CategoricalDtype):
+                    tabela[col] = tabela[col].astype(object)
+                elif pd.api.types.is_datetime64_any_dtype(tabela[col]):
+                    tabela[col] = tabela[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+                elif pd.api.types.is_bool_dtype(tabela[col]):
+                    tabela[col] = tabela[col].astype('int8')
+            self._conexao = sqlite3.connect(":memory:", check_same_thread=False)
+            tabela.to_sql('os', self._conexao, index=False)
+            self._conexao.execute('CREATE INDEX idx_os_abertura ON os ("Abertura")')
+
+    def _parametro_data(self, data):
+        if self.motor == MOTOR_SQLITE:
+            return data.strftime('%Y-%m-%d %H:%M:%S')
+        return data.to_pydatetime()
+
+    def _consultar(self, sql, parametros):
+        with self._trava:
+            if self.motor == MOTOR_DUCKDB:
+                return self._conexao.execute(sql, parametros).df()
+            return pd.read_sql_query(sql, self._conexao, params=parametros)
+
+    def _where(self, selecoes, data_inicio, data_fim, situacoes=None):
+        condicoes, parametros = [], []
+
+        for col, valores in selecoes.items():
+            if valores is None:
+                condicoes.append(f"{_coluna(col)} IS NOT NULL")
+            elif len(valores) == 0:
+                condicoes.append("1 = 0")
+            else:
+                condicoes.append(f"{_coluna(col)} IN ({', '.join('?' * len(valores))})")
+                parametros.extend(str(v) for v in valores)
+
+        if data_inicio is not None:
+            condicoes.append('"Abertura" >= ?')
+            parametros.append(self._parametro_data(pd.Timestamp(data_inicio)))
+        if data_fim is not None:
+            # data_fim é inclusiva (o dia inteiro)
+            condicoes.append('"Abertura" < ?')
+            parametros.append(self._parametro_data(pd.Timestamp(data_fim) + pd.Timedelta(days=1)))
+
+        if situacoes is not None:
+            condicoes.append(f'"SITUAÇÃO OS" IN ({", ".join("?" * len(situacoes))})')
+            parametros.extend(situacoes)
+
+        where = " AND ".join(condicoes) if condicoes else "1 = 1"
+        return where, parametros
+
+    def base(self, selecoes, data_inicio, data_fim):
+        where, parametros = self._where(selecoes, data_inicio, data_fim)
+        dimensoes = ", ".join(_coluna(col) for col in DIMENSOES_CUBO)
+        sql = f"""
+            SELECT {dimensoes},
+                   COUNT(*) AS "Total",
+                   SUM(CASE WHEN "SITUAÇÃO OS" = 'Fechada' THEN 1 ELSE 0 END) AS "Fechadas",
+                   SUM(CASE WHEN "Fechada_Mesmo_Mes" THEN 1 ELSE 0 END) AS "Fechadas_Mesmo_Mes",
+                   SUM(COALESCE("Tempo (dias)", 0)) AS "Soma_Tempo",
+                   SUM(CASE WHEN "Fechamento" IS NOT NULL THEN 1 ELSE 0 END) AS "Qtd_Tempo"
+            FROM os
+            WHERE {where}
+            GROUP BY {dimensoes}
+        """
+        base = self._consultar(sql, parametros)
+        # Mesmos tipos do cubo em pandas (inclusive quando a seleção não tem linhas)
+        tipos = {medida: 'int64' for medida in MEDIDAS}
+        tipos.update({'Soma_Tempo': 'float64', 'Mes_Abertura': 'int64'})
+        return base.fillna({medida: 0 for medida in MEDIDAS}).astype(tipos)
+
+    def contagem(self, coluna, selecoes, data_inicio, data_fim):
+        where, parametros = self._where(selecoes, data_inicio, data_fim)
+        sql = f"""
+            SELECT {_coluna(coluna)} AS valor, COUNT(*) AS qtd
+            FROM os
+            WHERE {where} AND {_coluna(coluna)} IS NOT NULL
+            GROUP BY {_coluna(coluna)}
+        """
+        resultado = self._consultar(sql, parametros)
+        return normalizar_contagem(resultado.set_index('valor')['qtd'])
+
+    def linhas(self, selecoes, data_inicio, data_fim, situacoes=None):
+        where, parametros = self._where(selecoes, data_inicio, data_fim, situacoes)
+        colunas = ", ".join(_coluna(col) for col in self.colunas)
+        df = self._consultar(f"SELECT {colunas} FROM os WHERE {where} ORDER BY _linha", parametros)
+        for col in COLUNAS_DATA:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return df
+
+    def distintos(self, colunas):
+        selecao = ", ".join(_coluna(col) for col in colunas)
+        return self._consultar(f"SELECT DISTINCT {selecao} FROM os", [])
+
+    def periodo(self):
+        limites = self._consultar('SELECT MIN("Abertura") AS minimo, MAX("Abertura") AS maximo FROM os', [])
+        return pd.Timestamp(limites['minimo'].iloc[0]), pd.Timestamp(limites['maximo'].iloc[0])
+
+
+def criar_consultas(df, motor=None, anterior=None, meses_alterados=None):
+    """Consultas no motor pedido (ou em DASHBOARD_MOTOR), com o pandas como alternativa.
+
+    Com as consultas da versão anterior e a lista de meses alterados, o motor
+    pandas atualiza o cubo só nesses meses em vez de reagregar o histórico.
+    """
+    motor = (motor or os.environ.get("DASHBOARD_MOTOR", MOTOR_PANDAS)).lower()
+
+    if motor == MOTOR_DUCKDB and duckdb is None:
+        logger.warning("DuckDB não está instalado; usando o motor pandas.")
+        motor = MOTOR_PANDAS
+
+    if motor in (MOTOR_DUCKDB, MOTOR_SQLITE):
+        try:
+            return ConsultasSQL(df, motor)
+        except Exception:
+            logger.exception("Falha ao carregar o motor %s; usando o motor pandas.", motor)
+
+    cubo = None
+    if isinstance(anterior, ConsultasPandas) and meses_alterados is not None:
+        cubo = anterior.cubo.atualizar(df, meses_alterados)
+    return ConsultasPandas(df, cubo)
@@ -0,0 +1,115 @@
+# scripts/cubo.py
+
+"""Cubo mensal pré-agregado para os gráficos de KPI, evolução e rankings.
+
+O cubo é montado uma vez por carga de dados com as dimensões da sidebar, o mês
+de abertura e a situação da OS, e medidas aditivas (contagens e soma de dias).
+Qualquer seleção da sidebar vira um recorte do cubo seguido de um groupby, com
+custo proporcional ao número de grupos distintos, não ao número de OS.
+
+O período só é respondido pelo cubo quando cada mês fica inteiro dentro ou
+inteiro fora do intervalo; com um mês cortado pela metade `recortar` devolve
+None e quem chama agrega as linhas filtradas com `construir_cubo`.
+"""
+
+import pandas as pd
+
+from scripts.filtros import DIMENSOES_FILTRO
+
+DIMENSOES_CUBO = ['Mes_Abertura', 'SITUAÇÃO OS'] + DIMENSOES_FILTRO
+
+MEDIDAS = ['Total', 'Fechadas', 'Fechadas_Mesmo_Mes', 'Soma_Tempo', 'Qtd_Tempo']
+
+
+def construir_cubo(df, dimensoes=DIMENSOES_CUBO):
+    """Agrega as linhas de OS nas dimensões informadas com as medidas aditivas."""
+    medidas = pd.DataFrame({
+        'Total': 1,
+        'Fechadas': (df['SITUAÇÃO OS'] == 'Fechada').astype('int32'),
+        'Fechadas_Mesmo_Mes': df['Fechada_Mesmo_Mes'].astype('int32'),
+        'Soma_Tempo': df['Tempo (dias)'].fillna(0),
+        'Qtd_Tempo': df['Fechamento'].notna().astype('int32'),
+    }, index=df.index)
+    chaves = [df[col] for col in dimensoes]
+
+    cubo = medidas.groupby(chaves, observed=True, dropna=False, sort=False).sum().reset_index()
+    return cubo
+
+
+def agregar(cubo, por):
+    """Rola o cubo (ou um recorte dele) para as dimensões em `por`."""
+    return cubo.groupby(por, observed=True)[MEDIDAS].sum().reset_index()
+
+
+def _limites_mes(df):
+    return df.groupby('Mes_Abertura')['Abertura'].agg(['min', 'max'])
+
+
+class CuboMensal:
+    """Cubo de uma versão dos dados, com os limites de data de cada mês."""
+
+    def __init__(self, df):
+        com_data = df[df['Abertura'].notna()]
+        self.dados = construir_cubo(com_data)
+
+        # Primeira e última abertura de cada mês (para saber se o período corta o mês)
+        self.limites_mes = _limites_mes(com_data)
+
+        # OS sem data de abertura não entram no cubo (só importam quando não há período)
+        self.tem_sem_data = len(com_data) < len(df)
+
+    def atualizar(self, df, meses):
+        """Cubo de uma nova versão `df` em que só os `meses` mudaram.
+
+        Os grupos dos demais meses vêm deste cubo; só os meses alterados são
+        reagregados a partir das linhas.
+        """
+        alterados = df[df['Abertura'].notna() & df['Mes_Abertura'].isin(meses)]
+        mantidos = ~self.dados['Mes_Abertura'].isin(meses)
+
+        novo = CuboMensal.__new__(CuboMensal)
+        novo.dados = pd.concat([self.dados[mantidos], construir_cubo(alterados)], ignore_index=True)
+        novo.limites_mes = pd.concat([
+            self.limites_mes[~self.limites_mes.index.isin(meses)],
+            _limites_mes(alterados)
+        ]).sort_index()
+        novo.tem_sem_data = bool(df['Abertura'].isna().any())
+
+        # As categorias da nova versão podem ter valores novos
+        for col in DIMENSOES_CUBO:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                novo.dados[col] = novo.dados[col].astype(object).astype(df[col].dtype)
+        return novo
+
+    def _meses_no_periodo(self, data_inicio, data_fim):
+        """Meses inteiramente dentro do período, ou None se algum mês ficar cortado.
+
+        Mesmo contrato do índice de filtros e dos motores SQL: `date`,
+        `datetime` ou `pd.Timestamp`, data_fim inclusiva (o dia inteiro) e None
+        para um lado sem limite.
+        """
+        if data_inicio is None and data_fim is None and self.tem_sem_data:
+            return None
+
+        limites = self.limites_mes
+        inicio = pd.Timestamp(data_inicio) if data_inicio is not None else limites['min'].min()
+        fim = pd.Timestamp(data_fim) + pd.Timedelta(days=1) if data_fim is not None else limites['max'].max() + pd.Timedelta(days=1)
+        dentro = (limites['min'] >= inicio) & (limites['max'] < fim)
+        fora = (limites['max'] < inicio) | (limites['min'] >= fim)
+        if not (dentro | fora).all():
+            return None
+        return limites.index[dentro]
+
+    def recortar(self, selecoes, data_inicio, data_fim):
+        """Linhas do cubo que atendem à seleção (None = usar as linhas filtradas)."""
+        meses = self._meses_no_periodo(data_inicio, data_fim)
+        if meses is None:
+            return None
+
+        mascara = self.dados['Mes_Abertura'].isin(meses)
+        for col, valores in selecoes.items():
+            if valores is None:
+                mascara &= self.dados[col].notna()
+            else:
+                mascara &= self.dados[col].isin(valores)
+        return self.dados[mascara]
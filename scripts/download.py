@@ -0,0 +1,146 @@
+# scripts/download.py
+
+"""Busca condicional do Excel de origem.
+
+Funciona como a revalidação HTTP por ETag/Last-Modified: o arquivo anterior e
+seus metadados ficam guardados ao lado do destino (`<destino>.meta.json`).
+A cada atualização só os metadados da origem são consultados; o download só
+acontece quando eles mudaram, e o novo arquivo substitui o antigo de forma
+atômica.
+
+O transporte é plugável. `TransporteGoogleDrive` é o padrão em produção e
+`TransporteDiretorioLocal` substitui o Drive em testes e execuções offline.
+"""
+
+import json
+import os
+import shutil
+import urllib.error
+import urllib.request
+
+import gdown
+
+from scripts.snapshot import hash_arquivo
+
+
+class TransporteGoogleDrive:
+    """Arquivo público no Google Drive.
+
+    Com a variável GDRIVE_API_KEY os metadados vêm da API do Drive
+    (md5Checksum/modifiedTime); sem ela, dos cabeçalhos ETag/Last-Modified
+    de um HEAD no link de download.
+    """
+
+    def __init__(self, file_id, api_key=None):
+        self.file_id = file_id
+        self.api_key = api_key or os.environ.get("GDRIVE_API_KEY")
+
+    @property
+    def url(self):
+        return f"https://drive.google.com/uc?id={self.file_id}&export=download"
+
+    def metadados(self):
+        try:
+            if self.api_key:
+                return self._metadados_api()
+            return self._metadados_head()
+        except (urllib.error.URLError, TimeoutError, ValueError):
+            return None
+
+    def _metadados_api(self):
+        url = (
+            f"https://www.googleapis.com/drive/v3/files/{self.file_id}"
+            f"?fields=md5Checksum,modifiedTime,size&key={self.api_key}"
+        )
+        with urllib.request.urlopen(url, timeout=15) as resp:
+            dados = json.load(resp)
+        return {k: dados.get(k) for k in ("md5Checksum", "modifiedTime", "size")}
+
+    def _metadados_head(self):
+        req = urllib.request.Request(self.url, method="HEAD")
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            cabecalhos = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "tamanho": resp.headers.get("Content-Length"),
+            }
+        # Sem validadores a origem não pode ser revalidada
+        if not cabecalhos["etag"] and not cabecalhos["last_modified"]:
+            return None
+        return cabecalhos
+
+    def baixar(self, destino):
+        gdown.download(f"https://drive.google.com/uc?id={self.file_id}", destino, quiet=True)
+
+
+class TransporteDiretorioLocal:
+    """Stand-in do Drive: lê o arquivo de uma pasta local."""
+
+    def __init__(self, diretorio, nome_arquivo):
+        self.origem = os.path.join(diretorio, nome_arquivo)
+
+    def metadados(self):
+        info = os.stat(self.origem)
+        return {"mtime_ns": info.st_mtime_ns, "tamanho": info.st_size}
+
+    def baixar(self, destino):
+        shutil.copyfile(self.origem, destino)
+
+
+class ResultadoBusca:
+    """Resultado de `atualizar_arquivo`."""
+
+    def __init__(self, caminho, alterado, sha256):
+        self.caminho = caminho
+        self.alterado = alterado
+        self.sha256 = sha256
+
+    def __repr__(self):
+        return f"ResultadoBusca(caminho={self.caminho!r}, alterado={self.alterado}, sha256={self.sha256[:12]!r})"
+
+
+def _caminho_meta(destino):
+    return destino + ".meta.json"
+
+
+def _ler_meta(destino):
+    try:
+        with open(_caminho_meta(destino), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_meta(destino, meta):
+    temporario = _caminho_meta(destino) + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(temporario, _caminho_meta(destino))
+
+
+def atualizar_arquivo(transporte, destino):
+    """Garante em `destino` a versão atual da origem, baixando só se ela mudou."""
+    meta_anterior = _ler_meta(destino)
+    meta_origem = transporte.metadados()
+
+    if (
+        meta_origem is not None
+        and meta_anterior is not None
+        and meta_anterior.get("origem") == meta_origem
+        and os.path.exists(destino)
+    ):
+        return ResultadoBusca(destino, alterado=False, sha256=meta_anterior["sha256"])
+
+    # Baixa ao lado do destino e troca de forma atômica
+    pasta = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(pasta, exist_ok=True)
+    parcial = destino + ".parcial"
+    transporte.baixar(parcial)
+    sha = hash_arquivo(parcial)
+
+    # Origem sem validadores: o conteúdo baixado decide se houve mudança
+    alterado = meta_anterior is None or meta_anterior.get("sha256") != sha or not os.path.exists(destino)
+    os.replace(parcial, destino)
+    _gravar_meta(destino, {"origem": meta_origem, "sha256": sha})
+
+    return ResultadoBusca(destino, alterado=alterado, sha256=sha)
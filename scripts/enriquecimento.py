@@ -0,0 +1,88 @@
+# scripts/enriquecimento.py
+
+"""Colunas derivadas calculadas uma única vez na carga.
+
+Ficam gravadas no snapshot junto com os dados, então app.py,
+painel_sistemas.py e enviar_ranking.py só leem as colunas prontas:
+
+- Mes_Abertura / Mes_Fechamento: mês como inteiro AAAAMM (0 quando sem data)
+- Fechada_Mesmo_Mes: OS 'Fechada' com fechamento no mesmo mês da abertura
+- Tempo (dias): dias entre abertura e fechamento (NaN se não fechada)
+- PENDÊNCIAS EM ABERTO: rótulo normalizado ('Sem Pendência' para vazios)
+- CAUSA / OCORRÊNCIA: texto em minúsculas, sem espaços sobrando, como
+  categoria (o ranking de problemas conta códigos inteiros)
+- CAUSA_CANONICA / OCORRÊNCIA_CANONICA: texto canônico do problema, juntando
+  variações de acento, pontuação e digitação (ver scripts/causas.py)
+"""
+
+import numpy as np
+import pandas as pd
+
+from scripts.causas import dicionario_canonico
+from scripts.esquema import COLUNAS_PROBLEMAS, normalizar_rotulos
+
+SEM_PENDENCIA = 'Sem Pendência'
+
+
+def mes_inteiro(datas):
+    """Converte datas em inteiros AAAAMM (0 para datas nulas)."""
+    mes = datas.dt.year * 100 + datas.dt.month
+    return mes.fillna(0).astype('int32')
+
+
+def mes_para_data(meses):
+    """Converte inteiros AAAAMM de volta para o primeiro dia do mês."""
+    meses = pd.Series(meses)
+    return pd.to_datetime(
+        pd.DataFrame({'year': meses // 100, 'month': meses % 100, 'day': 1}),
+        errors='coerce'
+    )
+
+
+def mapear_categorias(serie, funcao, valor_nulo=None):
+    """Aplica `funcao` só às categorias (não às linhas) e junta rótulos repetidos."""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+
+    rotulos = np.array([funcao(c) for c in serie.cat.categories], dtype=object)
+    if valor_nulo is not None:
+        rotulos = np.append(rotulos, valor_nulo)
+
+    novas, inverso = np.unique(rotulos, return_inverse=True)
+    codigos = serie.cat.codes.to_numpy()
+    if valor_nulo is not None:
+        codigos = np.where(codigos < 0, len(rotulos) - 1, codigos)
+    novos_codigos = np.where(codigos < 0, -1, inverso[codigos])
+
+    return pd.Series(
+        pd.Categorical.from_codes(novos_codigos, categories=novas),
+        index=serie.index,
+        name=serie.name
+    )
+
+
+def enriquecer(df):
+    """Acrescenta as colunas derivadas ao DataFrame de OS."""
+    df = df.copy()
+
+    df['Mes_Abertura'] = mes_inteiro(df['Abertura'])
+    df['Mes_Fechamento'] = mes_inteiro(df['Fechamento'])
+
+    df['Fechada_Mesmo_Mes'] = (
+        (df['SITUAÇÃO OS'] == 'Fechada') &
+        df['Fechamento'].notna() &
+        (df['Mes_Abertura'] == df['Mes_Fechamento'])
+    )
+
+    df['Tempo (dias)'] = (df['Fechamento'] - df['Abertura']).dt.days
+
+    df['PENDÊNCIAS EM ABERTO'] = mapear_categorias(
+        df['PENDÊNCIAS EM ABERTO'], lambda rotulo: str(rotulo).title(), valor_nulo=SEM_PENDENCIA
+    )
+
+    for col in COLUNAS_PROBLEMAS:
+        if col in df.columns:
+            df[col] = mapear_categorias(normalizar_rotulos(df[col]), str.lower)
+            df[f'{col}_CANONICA'] = mapear_categorias(df[col], dicionario_canonico(df[col]).__getitem__)
+
+    return df
@@ -0,0 +1,380 @@
+# scripts/envio.py
+
+"""Despacho de e-mails em lote: montagem concorrente, conexões SMTP reaproveitadas,
+novas tentativas com backoff e limite de taxa.
+
+- As mensagens são montadas em paralelo (`construtores` threads): cada tarefa
+  devolve uma `Mensagem` (relatório, PDF e MIME já prontos).
+- O envio usa um pool de até `conexoes` sessões autenticadas, abertas sob
+  demanda e reaproveitadas entre mensagens; uma sessão que cai é descartada e
+  reaberta.
+- Erros transitórios (conexão, timeout, respostas 4xx) são repetidos com
+  backoff exponencial e jitter; erros permanentes (5xx) falham na hora.
+- `LimitadorTaxa` segura o ritmo no limite do provedor (mensagens por minuto).
+
+O transporte é plugável, como em scripts/download.py: `TransporteSMTP` para o
+servidor real (ou um SMTP local, sem TLS nem login), `TransporteArquivo` grava
+cada mensagem como .eml numa pasta. `ServidorSMTPLocal` é um servidor SMTP
+mínimo em memória para rodar e medir o pipeline inteiro offline:
+
+    python -m scripts.envio --mensagens 500 --conexoes 1 2 4 --latencia-ms 20
+"""
+
+import logging
+import os
+import queue
+import random
+import smtplib
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# Limite padrão do provedor (Gmail/Workspace aceita bem menos que isso por minuto em contas comuns)
+MENSAGENS_POR_MINUTO = 60
+
+
+@dataclass
+class Mensagem:
+    """E-mail pronto para envio."""
+
+    email: object
+    destinatarios: tuple
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+
+
+@dataclass
+class ResultadoDespacho:
+    enviadas: list = field(default_factory=list)
+    falhas: list = field(default_factory=list)  # (id, erro)
+    tentativas: int = 0
+    conexoes_abertas: int = 0
+    segundos: float = 0.0
+
+    @property
+    def por_segundo(self):
+        return len(self.enviadas) / self.segundos if self.segundos else 0.0
+
+
+class TransporteSMTP:
+    """Servidor SMTP (padrão: Gmail com STARTTLS). Sem usuário, não faz login."""
+
+    def __init__(self, host="smtp.gmail.com", porta=587, usuario=None, senha=None, starttls=True, timeout=30):
+        self.host = host
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def abrir(self):
+        conexao = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conexao.starttls()
+            if self.usuario:
+                conexao.login(self.usuario, self.senha)
+        except Exception:
+            conexao.close()
+            raise
+        return conexao
+
+    def enviar(self, conexao, mensagem):
+        conexao.send_message(mensagem.email, to_addrs=list(mensagem.destinatarios))
+
+    def fechar(self, conexao):
+        try:
+            conexao.quit()
+        except (smtplib.SMTPException, OSError):
+            conexao.close()
+
+
+class TransporteArquivo:
+    """Grava cada mensagem como `<id>.eml` na pasta (nada sai da máquina)."""
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+
+    def abrir(self):
+        return self
+
+    def enviar(self, conexao, mensagem):
+        caminho = os.path.join(self.pasta, f"{mensagem.id}.eml")
+        with open(caminho, "wb") as f:
+            f.write(mensagem.email.as_bytes())
+
+    def fechar(self, conexao):
+        pass
+
+
+def erro_transitorio(erro):
+    """Vale a pena tentar de novo? (queda de conexão, timeout ou resposta 4xx)."""
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return all(400 <= codigo < 500 for codigo, _ in erro.recipients.values())
+    if isinstance(erro, smtplib.SMTPResponseException):
+        return 400 <= erro.smtp_code < 500
+    return isinstance(erro, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+class PoolConexoes:
+    """Até `tamanho` conexões do transporte, abertas sob demanda e reaproveitadas."""
+
+    def __init__(self, transporte, tamanho=2):
+        self.transporte = transporte
+        self.tamanho = tamanho
+        self.abertas = 0
+        self._livres = queue.LifoQueue()
+        self._vagas = threading.Semaphore(tamanho)
+        self._trava = threading.Lock()
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão; ela só é descartada se o bloco falhar com erro de conexão.
+
+        Recusas e respostas 4xx/5xx de uma mensagem (SMTPException, que também
+        é OSError) não afetam a conexão, que volta ao pool.
+        """
+        self._vagas.acquire()
+        try:
+            try:
+                conexao = self._livres.get_nowait()
+            except queue.Empty:
+                conexao = self.transporte.abrir()
+                with self._trava:
+                    self.abertas += 1
+            try:
+                yield conexao
+            except Exception as erro:
+                if isinstance(erro, smtplib.SMTPServerDisconnected) or (
+                    isinstance(erro, OSError) and not isinstance(erro, smtplib.SMTPException)
+                ):
+                    self.transporte.fechar(conexao)
+                else:
+                    self._livres.put(conexao)
+                raise
+            self._livres.put(conexao)
+        finally:
+            self._vagas.release()
+
+    def fechar(self):
+        while True:
+            try:
+                self.transporte.fechar(self._livres.get_nowait())
+            except queue.Empty:
+                return
+
+
+class LimitadorTaxa:
+    """Balde de fichas: no máximo `por_minuto` mensagens por minuto, com rajada de `rajada`."""
+
+    def __init__(self, por_minuto=MENSAGENS_POR_MINUTO, rajada=1):
+        self.intervalo = 60.0 / por_minuto if por_minuto else 0.0
+        self.rajada = rajada
+        self._fichas = float(rajada)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def aguardar(self):
+        if not self.intervalo:
+            return
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self._fichas = min(self.rajada, self._fichas + (agora - self._ultimo) / self.intervalo)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) * self.intervalo
+            time.sleep(espera)
+
+
+def _enviar_com_tentativas(pool, mensagem, limitador, tentativas, espera_base, espera_maxima, contador):
+    for tentativa in range(1, tentativas + 1):
+        limitador.aguardar()
+        try:
+            with pool.conexao() as conexao:
+                with contador['trava']:
+                    contador['tentativas'] += 1
+                pool.transporte.enviar(conexao, mensagem)
+            return
+        except Exception as erro:
+            if tentativa == tentativas or not erro_transitorio(erro):
+                raise
+            espera = min(espera_maxima, espera_base * 2 ** (tentativa - 1)) * (0.5 + random.random())
+            logger.warning("Falha ao enviar %s (%s); nova tentativa em %.1fs", mensagem.id, erro, espera)
+            time.sleep(espera)
+
+
+def despachar(tarefas, transporte, construtores=4, conexoes=2, por_minuto=MENSAGENS_POR_MINUTO,
+              tentativas=4, espera_base=1.0, espera_maxima=30.0):
+    """Monta e envia as mensagens.
+
+    `tarefas` são funções sem argumentos que devolvem uma Mensagem; são
+    executadas em `construtores` threads e cada mensagem pronta entra na fila
+    de envio, atendida por `conexoes` conexões do transporte.
+    """
+    resultado = ResultadoDespacho()
+    pool = PoolConexoes(transporte, conexoes)
+    limitador = LimitadorTaxa(por_minuto, rajada=conexoes)
+    contador = {'tentativas': 0, 'trava': threading.Lock()}
+    inicio = time.perf_counter()
+
+    with ThreadPoolExecutor(construtores, thread_name_prefix="montagem") as montagem, \
+            ThreadPoolExecutor(conexoes, thread_name_prefix="envio") as envio:
+        envios = {}
+        for futuro in as_completed([montagem.submit(tarefa) for tarefa in tarefas]):
+            try:
+                mensagem = futuro.result()
+            except Exception as erro:
+                logger.exception("Falha ao montar uma mensagem")
+                resultado.falhas.append((None, erro))
+                continue
+            envios[envio.submit(
+                _enviar_com_tentativas, pool, mensagem, limitador, tentativas, espera_base, espera_maxima, contador
+            )] = mensagem
+
+        for futuro in as_completed(envios):
+            mensagem = envios[futuro]
+            try:
+                futuro.result()
+                resultado.enviadas.append(mensagem.id)
+            except Exception as erro:
+                logger.error("Mensagem %s não enviada: %s", mensagem.id, erro)
+                resultado.falhas.append((mensagem.id, erro))
+
+    pool.fechar()
+    resultado.segundos = time.perf_counter() - inicio
+    resultado.tentativas = contador['tentativas']
+    resultado.conexoes_abertas = pool.abertas
+    return resultado
+
+
+class _SessaoSMTP(socketserver.StreamRequestHandler):
+    """Diálogo SMTP mínimo: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP e QUIT."""
+
+    def _responder(self, linha):
+        self.wfile.write(linha.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        servidor = self.server
+        self._responder("220 smtp-local pronto")
+        destinatarios, remetente = [], None
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode("ascii", "replace").strip()
+            verbo = comando[:4].upper()
+
+            if verbo in ("EHLO", "HELO"):
+                self._responder("250 smtp-local")
+            elif verbo == "MAIL":
+                remetente, destinatarios = comando[10:].strip(), []
+                self._responder("250 OK")
+            elif verbo == "RCPT":
+                destinatarios.append(comando[8:].strip())
+                self._responder("250 OK")
+            elif verbo == "DATA":
+                self._responder("354 Fim com <CRLF>.<CRLF>")
+                partes = []
+                for linha_dados in iter(self.rfile.readline, b""):
+                    if linha_dados in (b".\r\n", b".\n"):
+                        break
+                    partes.append(linha_dados[1:] if linha_dados.startswith(b"..") else linha_dados)
+                if servidor.latencia:
+                    time.sleep(servidor.latencia)
+                servidor.receber(remetente, destinatarios, b"".join(partes))
+                self._responder("250 OK")
+            elif verbo == "RSET":
+                destinatarios, remetente = [], None
+                self._responder("250 OK")
+            elif verbo == "NOOP":
+                self._responder("250 OK")
+            elif verbo == "QUIT":
+                self._responder("221 Ate logo")
+                return
+            else:
+                self._responder("502 Comando nao implementado")
+
+
+class ServidorSMTPLocal(socketserver.ThreadingTCPServer):
+    """Servidor SMTP em 127.0.0.1 que só conta (ou grava em `pasta`) as mensagens recebidas.
+
+    `latencia` (s) simula o tempo de resposta do provedor a cada mensagem.
+
+        with ServidorSMTPLocal() as servidor:
+            transporte = TransporteSMTP("127.0.0.1", servidor.porta, starttls=False)
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, porta=0, pasta=None, latencia=0.0):
+        super().__init__(("127.0.0.1", porta), _SessaoSMTP)
+        self.pasta = pasta
+        self.latencia = latencia
+        self.recebidas = 0
+        self._trava = threading.Lock()
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+    @property
+    def porta(self):
+        return self.server_address[1]
+
+    def receber(self, remetente, destinatarios, dados):
+        with self._trava:
+            self.recebidas += 1
+            numero = self.recebidas
+        if self.pasta:
+            with open(os.path.join(self.pasta, f"{numero:06d}.eml"), "wb") as f:
+                f.write(dados)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="smtp-local", daemon=True).start()
+        return self
+
+    def __exit__(self, *excecao):
+        self.shutdown()
+        self.server_close()
+        return False
+
+
+def _mensagem_teste(numero):
+    from email.mime.text import MIMEText
+
+    email = MIMEText(f"<p>Relatório de teste {numero}</p>" * 50, "html")
+    email["From"] = "relatorios@exemplo.invalid"
+    email["To"] = f"destino{numero}@exemplo.invalid"
+    email["Subject"] = f"Teste {numero}"
+    return Mensagem(email, (email["To"],))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vazão do despacho de e-mails contra um SMTP local (offline).")
+    parser.add_argument("--mensagens", type=int, default=200)
+    parser.add_argument("--conexoes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latencia-ms", type=float, default=20, help="Latência simulada do servidor por mensagem")
+    parser.add_argument("--por-minuto", type=int, default=0, help="Limite de taxa (0 = sem limite)")
+    args = parser.parse_args()
+
+    for conexoes in args.conexoes:
+        with ServidorSMTPLocal(latencia=args.latencia_ms / 1000) as servidor:
+            transporte = TransporteSMTP("127.0.0.1", servidor.porta, starttls=False)
+            tarefas = [lambda n=n: _mensagem_teste(n) for n in range(args.mensagens)]
+            resultado = despachar(tarefas, transporte, conexoes=conexoes, por_minuto=args.por_minuto)
+        print(
+            f"{conexoes} conexão(ões): {len(resultado.enviadas)} enviadas em {resultado.segundos:.2f}s "
+            f"({resultado.por_segundo:.1f}/s), {resultado.conexoes_abertas} sessão(ões) SMTP, "
+            f"{len(resultado.falhas)} falha(s)"
+        )
@@ -0,0 +1,78 @@
+# scripts/esquema.py
+
+"""Esquema de tipos do DataFrame de OS, aplicado na carga.
+
+As colunas de dimensão viram categorias (filtros e groupbys passam a trabalhar
+sobre códigos inteiros) e as colunas inteiras são reduzidas ao menor tipo que
+comporta os valores.
+"""
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colunas de texto com poucos valores distintos
+COLUNAS_CATEGORICAS = [
+    'CLIENTE',
+    'SUPERVISOR',
+    'COORDENADOR',
+    'REGIÃO',
+    'CIDADE',
+    'GRUPO',
+    'TIPO DE MANUTENÇÃO2',
+    'SITUAÇÃO OS',
+    'PENDÊNCIAS EM ABERTO',
+]
+
+# Colunas de data
+COLUNAS_DATA = ['Abertura', 'Fechamento']
+
+# Textos livres dos problemas recorrentes (normalizados e categorizados em scripts/enriquecimento.py)
+COLUNAS_PROBLEMAS = ['CAUSA', 'OCORRÊNCIA']
+
+
+def memoria_mb(df):
+    """Memória ocupada pelo DataFrame (inclui o conteúdo das strings)."""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def normalizar_rotulos(serie):
+    """Remove espaços nas pontas e espaços duplicados; texto vazio vira nulo."""
+    texto = serie.astype('string').str.strip().str.replace(r'\s+', ' ', regex=True)
+    return texto.mask(texto == '')
+
+
+def _para_categoria(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return normalizar_rotulos(serie).astype(object).astype('category')
+
+
+def _reduzir_inteiros(serie):
+    """Reduz colunas inteiras (ou float sem casas decimais e sem nulos) ao menor int."""
+    if pd.api.types.is_integer_dtype(serie):
+        return pd.to_numeric(serie, downcast='integer')
+    if pd.api.types.is_float_dtype(serie) and serie.notna().all() and (serie % 1 == 0).all():
+        return pd.to_numeric(serie.astype('int64'), downcast='integer')
+    return serie
+
+
+def aplicar_esquema(df):
+    """Converte as colunas para os tipos compactos e registra a memória antes/depois."""
+    antes = memoria_mb(df)
+    df = df.copy()
+
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = _para_categoria(df[col])
+
+    for col in df.columns:
+        if col not in COLUNAS_CATEGORICAS and col not in COLUNAS_DATA:
+            df[col] = _reduzir_inteiros(df[col])
+
+    depois = memoria_mb(df)
+    df.attrs['memoria_mb'] = {'antes': round(antes, 2), 'depois': round(depois, 2)}
+    logger.info("Esquema aplicado: %.1f MB -> %.1f MB (%.1fx)", antes, depois, antes / depois if depois else 0)
+    return df
@@ -0,0 +1,85 @@
+# scripts/exportacao.py
+
+"""Exportação do backlog de OS (Excel, CSV ou Parquet).
+
+Os arquivos só são gerados quando o usuário pede. O Excel é escrito linha a
+linha pelo xlsxwriter; acima de LIMITE_MEMORIA_CONSTANTE linhas liga o modo
+`constant_memory`, que descarrega cada linha em disco em vez de manter a
+planilha inteira em memória. CSV e Parquet são bem mais rápidos de gerar.
+"""
+
+from io import BytesIO
+
+import pandas as pd
+import xlsxwriter
+
+# Acima disso o Excel é escrito em modo de memória constante
+LIMITE_MEMORIA_CONSTANTE = 50_000
+
+# Linhas convertidas por vez ao escrever o Excel
+TAMANHO_BLOCO = 10_000
+
+FORMATOS_EXPORTACAO = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/octet-stream"),
+}
+
+
+def colunas_backlog(df):
+    """Colunas de 'OS' até 'Nº Chamado' (ou todas, se alguma delas não existir)."""
+    if 'OS' in df.columns and 'Nº Chamado' in df.columns:
+        return df.loc[:, 'OS':'Nº Chamado']
+    return df
+
+
+def _linhas(df):
+    """Linhas como listas de objetos Python, com None no lugar de nulos."""
+    for inicio in range(0, len(df), TAMANHO_BLOCO):
+        bloco = df.iloc[inicio:inicio + TAMANHO_BLOCO].astype(object)
+        yield from bloco.where(bloco.notna(), None).values.tolist()
+
+
+def gerar_xlsx(df, nome_aba='Backlog', memoria_constante=None):
+    """Planilha Excel do DataFrame em bytes."""
+    if memoria_constante is None:
+        memoria_constante = len(df) > LIMITE_MEMORIA_CONSTANTE
+
+    saida = BytesIO()
+    workbook = xlsxwriter.Workbook(saida, {
+        'constant_memory': memoria_constante,
+        'default_date_format': 'dd/mm/yyyy hh:mm',
+        'remove_timezone': True,
+    })
+    aba = workbook.add_worksheet(nome_aba)
+    negrito = workbook.add_format({'bold': True, 'border': 1})
+
+    # No modo de memória constante as linhas precisam ser escritas em ordem
+    aba.write_row(0, 0, [str(col) for col in df.columns], negrito)
+    for i, linha in enumerate(_linhas(df), start=1):
+        aba.write_row(i, 0, linha)
+
+    workbook.close()
+    return saida.getvalue()
+
+
+def gerar_csv(df):
+    # utf-8-sig para o Excel abrir os acentos corretamente
+    return df.to_csv(index=False, sep=';', decimal=',', date_format='%d/%m/%Y %H:%M').encode('utf-8-sig')
+
+
+def gerar_parquet(df):
+    saida = BytesIO()
+    df.to_parquet(saida, index=False, compression='zstd')
+    return saida.getvalue()
+
+
+def exportar(df, formato):
+    """Bytes do arquivo no formato pedido ('Excel', 'CSV' ou 'Parquet')."""
+    if formato == "Excel":
+        return gerar_xlsx(df)
+    if formato == "CSV":
+        return gerar_csv(df)
+    if formato == "Parquet":
+        return gerar_parquet(df)
+    raise ValueError(f"Formato de exportação desconhecido: {formato}")
@@ -0,0 +1,165 @@
+# scripts/filtros.py
+
+"""Índice invertido para os filtros da sidebar.
+
+Para cada dimensão o índice guarda, por valor, a lista ordenada de linhas que
+o contêm (posições agrupadas pelo código da categoria), e para a data de
+abertura um índice ordenado. Uma seleção é resolvida começando pela restrição
+mais seletiva e conferindo as demais só nas linhas candidatas, então o custo
+acompanha o tamanho da seleção e não o tamanho do histórico.
+
+Dimensões com "Selecionar todos" (valor None) são ignoradas; só exigem valor
+não nulo, como o `.isin()` original, e mesmo isso é pulado quando a coluna
+não tem nulos.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Colunas filtráveis pela sidebar
+DIMENSOES_FILTRO = [
+    'CLIENTE',
+    'TIPO DE MANUTENÇÃO2',
+    'SUPERVISOR',
+    'COORDENADOR',
+    'REGIÃO',
+    'CIDADE',
+    'GRUPO',
+    'PENDÊNCIAS EM ABERTO',
+]
+
+
+class _IndiceDimensao:
+    """Linhas por valor de uma coluna categórica."""
+
+    def __init__(self, serie):
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        self.categorias = serie.cat.categories
+        self.codigos = serie.cat.codes.to_numpy()
+
+        # Posições ordenadas por código; limites[c]:limites[c + 1] são as linhas do código c
+        self.ordem = np.argsort(self.codigos, kind='stable')
+        self.limites = np.searchsorted(
+            self.codigos[self.ordem], np.arange(-1, len(self.categorias) + 1)
+        )
+        self.tem_nulos = bool(self.limites[1] > 0)
+
+    def codigos_de(self, valores):
+        codigos = self.categorias.get_indexer(list(valores))
+        return np.unique(codigos[codigos >= 0])
+
+    def tamanho(self, codigos):
+        # limites está deslocado em 1 por causa do código -1 (nulo)
+        return int((self.limites[codigos + 2] - self.limites[codigos + 1]).sum())
+
+    def linhas(self, codigos):
+        partes = [self.ordem[self.limites[c + 1]:self.limites[c + 2]] for c in codigos]
+        if not partes:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(partes))
+
+    def nao_nulas(self):
+        return np.sort(self.ordem[self.limites[1]:])
+
+    def filtra(self, linhas, codigos):
+        permitido = np.zeros(len(self.categorias) + 1, dtype=bool)
+        permitido[codigos + 1] = True
+        return linhas[permitido[self.codigos[linhas] + 1]]
+
+
+class IndiceFiltros:
+    """Índice das dimensões da sidebar e da data de abertura de um DataFrame."""
+
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, coluna_data='Abertura'):
+        self.total_linhas = len(df)
+        self.dimensoes = {col: _IndiceDimensao(df[col]) for col in dimensoes if col in df.columns}
+
+        datas = df[coluna_data].to_numpy(dtype='datetime64[ns]')
+        com_data = np.flatnonzero(~np.isnat(datas))
+        ordem = np.argsort(datas[com_data], kind='stable')
+        self._linhas_por_data = com_data[ordem]
+        self._datas_ordenadas = datas[com_data][ordem]
+        self._datas = datas
+
+    def _faixa_datas(self, data_inicio, data_fim):
+        inicio = np.datetime64(pd.Timestamp(data_inicio), 'ns') if data_inicio is not None else None
+        # data_fim é inclusiva (o dia inteiro)
+        fim = np.datetime64(pd.Timestamp(data_fim) + pd.Timedelta(days=1), 'ns') if data_fim is not None else None
+        esquerda = 0 if inicio is None else np.searchsorted(self._datas_ordenadas, inicio, side='left')
+        direita = len(self._datas_ordenadas) if fim is None else np.searchsorted(self._datas_ordenadas, fim, side='left')
+        return inicio, fim, esquerda, direita
+
+    def selecionar(self, selecoes, data_inicio=None, data_fim=None):
+        """Posições (ordenadas) das linhas que atendem à seleção.
+
+        `selecoes` mapeia coluna -> lista de valores; None significa todos.
+        Retorna None quando nenhuma restrição se aplica (todas as linhas).
+        """
+        restricoes = []  # (tamanho, tipo, dados)
+
+        for col, valores in selecoes.items():
+            dim = self.dimensoes[col]
+            if valores is None:
+                if dim.tem_nulos:
+                    restricoes.append((self.total_linhas - int(dim.limites[1]), 'nao_nulo', dim))
+                continue
+            codigos = dim.codigos_de(valores)
+            restricoes.append((dim.tamanho(codigos), 'valores', (dim, codigos)))
+
+        if data_inicio is not None or data_fim is not None:
+            inicio, fim, esquerda, direita = self._faixa_datas(data_inicio, data_fim)
+            restricoes.append((direita - esquerda, 'data', (inicio, fim, esquerda, direita)))
+
+        if not restricoes:
+            return None
+
+        # Começa pela restrição mais seletiva
+        restricoes.sort(key=lambda r: r[0])
+        _, tipo, dados = restricoes[0]
+        if tipo == 'valores':
+            dim, codigos = dados
+            linhas = dim.linhas(codigos)
+        elif tipo == 'nao_nulo':
+            linhas = dados.nao_nulas()
+        else:
+            _, _, esquerda, direita = dados
+            linhas = np.sort(self._linhas_por_data[esquerda:direita])
+
+        for _, tipo, dados in restricoes[1:]:
+            if len(linhas) == 0:
+                break
+            if tipo == 'valores':
+                dim, codigos = dados
+                linhas = dim.filtra(linhas, codigos)
+            elif tipo == 'nao_nulo':
+                linhas = linhas[dados.codigos[linhas] >= 0]
+            else:
+                inicio, fim, _, _ = dados
+                datas = self._datas[linhas]
+                dentro = ~np.isnat(datas)
+                if inicio is not None:
+                    dentro &= datas >= inicio
+                if fim is not None:
+                    dentro &= datas < fim
+                linhas = linhas[dentro]
+
+        return linhas
+
+    def aplicar(self, df, selecoes, data_inicio=None, data_fim=None):
+        """Atalho: devolve o recorte de `df` (o mesmo DataFrame usado no índice)."""
+        linhas = self.selecionar(selecoes, data_inicio, data_fim)
+        if linhas is None:
+            return df
+        return df.iloc[linhas]
+
+
+def assinatura_selecao(versao, selecoes, data_inicio, data_fim):
+    """Chave estável de uma seleção (versão dos dados + filtros + período) para caches."""
+    partes = [str(versao), str(data_inicio), str(data_fim)]
+    for col in sorted(selecoes):
+        valores = selecoes[col]
+        partes.append(f"{col}={'*' if valores is None else '|'.join(sorted(map(str, valores)))}")
+    return hashlib.sha1("\n".join(partes).encode("utf-8")).hexdigest()
@@ -0,0 +1,185 @@
+# scripts/instrumentacao.py
+
+"""Medição do tempo e da memória de cada seção dos painéis e etapas dos benchmarks.
+
+Cada execução de um painel gera um rastro (`Rastro`): a lista das seções
+medidas, na ordem, com início relativo, duração e memória residente. Ao fim
+da execução o rastro vira uma linha JSON no arquivo RASTROS_ARQUIVO
+(compartilhado por todas as sessões do processo); uma seção que reexecuta
+sozinha (fragment) grava um rastro próprio. Os percentis de latência por
+seção saem desse arquivo:
+
+    python -m scripts.instrumentacao /tmp/dashboard_rastros.jsonl
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+from config.paths import RASTROS_ARQUIVO
+from scripts.compartilhado import memoria_residente_mb
+
+# Várias sessões gravam no mesmo arquivo
+_trava_arquivo = threading.Lock()
+
+PERCENTIS = [50, 90, 99]
+
+
+class Rastro:
+    """Rastro de uma execução de um painel: tempo (ms) e memória (MB) de cada seção.
+
+    `tempos` recebe o último tempo de cada seção (por exemplo, um dicionário
+    do session_state, que continua valendo nas reexecuções dos fragments).
+    """
+
+    def __init__(self, pagina, sessao=None, tempos=None, arquivo=RASTROS_ARQUIVO, **contexto):
+        self.id = uuid.uuid4().hex[:12]
+        self.pagina = pagina
+        self.sessao = sessao
+        self.tempos = tempos if tempos is not None else {}
+        self.arquivo = arquivo
+        self.contexto = contexto
+        self.inicio = datetime.now()
+        self.secoes = []
+        self.finalizado = False
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def medir(self, secao):
+        """Mede o bloco como `secao` (também serve como decorador)."""
+        memoria_inicial = memoria_residente_mb()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = round((time.perf_counter() - inicio) * 1000, 1)
+            memoria = memoria_residente_mb()
+            self.tempos[secao] = ms
+            entrada = {
+                'secao': secao,
+                'inicio_ms': round((inicio - self._t0) * 1000, 1),
+                'ms': ms,
+                'memoria_mb': round(memoria, 1),
+                'delta_mb': round(memoria - memoria_inicial, 1),
+            }
+            if self.finalizado:
+                # Fragment reexecutado depois do fim da execução completa
+                entrada['inicio_ms'] = 0.0
+                self._gravar(self._registro('fragmento', datetime.now(), [entrada], ms))
+            else:
+                self.secoes.append(entrada)
+
+    def _registro(self, tipo, inicio, secoes, total_ms):
+        return {
+            'id': self.id,
+            'pagina': self.pagina,
+            'sessao': self.sessao,
+            'tipo': tipo,
+            'inicio': inicio.isoformat(timespec='milliseconds'),
+            'total_ms': total_ms,
+            'secoes': secoes,
+            **self.contexto,
+        }
+
+    def _gravar(self, registro):
+        if not self.arquivo:
+            return
+        with _trava_arquivo, open(self.arquivo, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    def finalizar(self):
+        """Fecha o rastro da execução, grava a linha JSON e devolve o registro."""
+        total_ms = round((time.perf_counter() - self._t0) * 1000, 1)
+        registro = self._registro('completa', self.inicio, self.secoes, total_ms)
+        self.finalizado = True
+        self._gravar(registro)
+        return registro
+
+    def tabela(self):
+        """Seções da execução como DataFrame (para o expander de debug)."""
+        colunas = {
+            'secao': 'Seção', 'inicio_ms': 'Início (ms)', 'ms': 'Tempo (ms)',
+            'memoria_mb': 'Memória (MB)', 'delta_mb': 'Δ Memória (MB)',
+        }
+        return pd.DataFrame(self.secoes, columns=list(colunas)).rename(columns=colunas)
+
+
+def para_jsonl(registros):
+    return "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in registros)
+
+
+def ler_rastros(arquivo=RASTROS_ARQUIVO):
+    with open(arquivo, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def percentis_por_secao(registros, percentis=PERCENTIS):
+    """Latência (ms) por página e seção: execuções, percentis, máximo e Δ memória médio.
+
+    A linha '(total)' de cada página é a duração das execuções completas.
+    """
+    linhas = []
+    for registro in registros:
+        for secao in registro['secoes']:
+            linhas.append((registro['pagina'], secao['secao'], secao['ms'], secao['delta_mb']))
+        if registro['tipo'] == 'completa':
+            linhas.append((registro['pagina'], '(total)', registro['total_ms'], None))
+
+    df = pd.DataFrame(linhas, columns=['pagina', 'secao', 'ms', 'delta_mb'])
+    grupos = df.groupby(['pagina', 'secao'], sort=True)
+    resumo = grupos['ms'].agg(['count', 'max'])
+    for p in percentis:
+        resumo[f'p{p}'] = grupos['ms'].quantile(p / 100)
+    resumo['delta_mb'] = grupos['delta_mb'].mean()
+    resumo = resumo.rename(columns={'count': 'execucoes'})
+    colunas = ['execucoes'] + [f'p{p}' for p in percentis] + ['max', 'delta_mb']
+    return resumo[colunas].round(1).reset_index().sort_values(['pagina', f'p{percentis[-1]}'], ascending=[True, False])
+
+
+class PicoMemoria:
+    """Pico de memória residente (MB) acima do início do bloco, amostrado em segundo plano.
+
+    Usa a RSS do processo, então inclui memória alocada fora do Python
+    (Arrow, xlsxwriter). Picos mais curtos que o intervalo podem escapar.
+    """
+
+    def __init__(self, intervalo=0.01):
+        self.intervalo = intervalo
+        self.mb = 0.0
+        self._parar = threading.Event()
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._pico = max(self._pico, memoria_residente_mb())
+
+    def __enter__(self):
+        self._inicial = self._pico = memoria_residente_mb()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._amostrar, name="pico-memoria", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *excecao):
+        self._parar.set()
+        self._thread.join()
+        self._pico = max(self._pico, memoria_residente_mb())
+        self.mb = round(self._pico - self._inicial, 1)
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Percentis de latência por seção a partir dos rastros JSONL.")
+    parser.add_argument("arquivo", nargs="?", default=RASTROS_ARQUIVO)
+    parser.add_argument("--pagina", help="Só esta página (app, painel_sistemas)")
+    args = parser.parse_args()
+
+    registros = [r for r in ler_rastros(args.arquivo) if args.pagina in (None, r['pagina'])]
+    print(f"📈 {len(registros)} rastros em {args.arquivo}")
+    print(percentis_por_secao(registros).to_string(index=False))
@@ -0,0 +1,154 @@
+# scripts/leitor_excel.py
+
+"""Leitura da aba de OS do Excel com motor plugável e projeção de colunas.
+
+Motores:
+
+- calamine: leitor em Rust (pacote python-calamine, pandas >= 2.2), o mais rápido
+- openpyxl_streaming: openpyxl em modo somente leitura, linha a linha, montando
+  só as colunas usadas
+- openpyxl: `pd.read_excel` com openpyxl (o caminho original)
+
+O motor vem do argumento, da variável DASHBOARD_LEITOR_EXCEL ou, por padrão,
+é o calamine se estiver instalado e o openpyxl_streaming caso contrário. Em
+todos só as colunas usadas pelos painéis são lidas (`colunas_usadas`), e as
+datas em texto são convertidas com formatos explícitos (FORMATOS_DATA).
+"""
+
+import logging
+import os
+import time
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from config.paths import SHEET_NAME
+from scripts.esquema import COLUNAS_CATEGORICAS, COLUNAS_DATA
+
+try:
+    import python_calamine  # noqa: F401  (usado pelo pandas via engine="calamine")
+except ImportError:  # motor opcional
+    python_calamine = None
+
+logger = logging.getLogger(__name__)
+
+MOTOR_CALAMINE = "calamine"
+MOTOR_OPENPYXL_STREAMING = "openpyxl_streaming"
+MOTOR_OPENPYXL = "openpyxl"
+
+MOTORES = [MOTOR_CALAMINE, MOTOR_OPENPYXL_STREAMING, MOTOR_OPENPYXL]
+
+# Colunas lidas além do intervalo exportado ('OS' até 'Nº Chamado')
+COLUNAS_ANALISE = COLUNAS_CATEGORICAS + COLUNAS_DATA + ['CAUSA', 'OCORRÊNCIA']
+
+# Formatos das datas digitadas como texto na planilha (células de data já vêm como datetime)
+FORMATOS_DATA = ['%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d']
+
+
+def motor_padrao():
+    motor = os.environ.get("DASHBOARD_LEITOR_EXCEL")
+    if motor:
+        return motor
+    return MOTOR_CALAMINE if python_calamine is not None else MOTOR_OPENPYXL_STREAMING
+
+
+def colunas_usadas(cabecalho):
+    """Colunas do cabeçalho usadas pelos painéis, na ordem da planilha.
+
+    Inclui todo o intervalo de 'OS' até 'Nº Chamado' (exportação do backlog)
+    e as colunas de análise.
+    """
+    cabecalho = list(cabecalho)
+    usadas = set(COLUNAS_ANALISE)
+    if 'OS' in cabecalho and 'Nº Chamado' in cabecalho:
+        usadas.update(cabecalho[cabecalho.index('OS'):cabecalho.index('Nº Chamado') + 1])
+    return [col for col in cabecalho if col in usadas]
+
+
+def converter_datas(serie, formatos=FORMATOS_DATA):
+    """Datas da coluna: células datetime são mantidas e textos usam os formatos explícitos, em ordem."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    eh_texto = serie.map(lambda valor: isinstance(valor, str))
+    datas = pd.to_datetime(serie.where(~eh_texto), errors='coerce')
+
+    textos = serie[eh_texto].str.strip()
+    for formato in formatos:
+        faltando = textos.index[datas[textos.index].isna()]
+        if len(faltando) == 0:
+            break
+        datas.loc[faltando] = pd.to_datetime(textos[faltando], format=formato, errors='coerce')
+
+    nao_convertidas = int((datas[textos.index].isna() & (textos != '')).sum())
+    if nao_convertidas:
+        logger.warning("%s: %d datas em texto fora dos formatos esperados", serie.name, nao_convertidas)
+    return datas
+
+
+def _ler_pandas(caminho, motor, sheet_name):
+    cabecalho = pd.read_excel(caminho, sheet_name=sheet_name, engine=motor, nrows=0).columns
+    usadas = set(colunas_usadas(cabecalho))
+    return pd.read_excel(caminho, sheet_name=sheet_name, engine=motor, usecols=lambda col: col in usadas)
+
+
+def _valor_celula(valor):
+    # Mesma conversão do pandas: vazio vira "" (tratado como nulo pelo parser)
+    # e números inteiros salvos como float voltam a int
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _ler_openpyxl_streaming(caminho, sheet_name):
+    import openpyxl
+
+    livro = openpyxl.load_workbook(caminho, read_only=True, data_only=True, keep_links=False)
+    try:
+        aba = livro[sheet_name]
+        primeira = next(aba.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        cabecalho = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(primeira)]
+        usadas = colunas_usadas(cabecalho)
+        posicoes = [cabecalho.index(col) for col in usadas]
+
+        # Colunas depois da última usada nem são convertidas em valores
+        linhas = aba.iter_rows(min_row=2, max_col=max(posicoes, default=0) + 1, values_only=True)
+
+        dados = [usadas]
+        for linha in linhas:
+            if linha is None or all(v is None for v in linha):
+                continue
+            dados.append([_valor_celula(linha[pos]) if pos < len(linha) else "" for pos in posicoes])
+    finally:
+        livro.close()
+
+    # Mesmo parser que o pd.read_excel usa sobre as células (inferência de tipos e nulos)
+    return TextParser(dados, header=0).read()
+
+
+def ler_aba_os(caminho, motor=None, sheet_name=SHEET_NAME):
+    """Lê só as colunas usadas da aba de OS, com as datas já convertidas."""
+    motor = motor or motor_padrao()
+    if motor == MOTOR_CALAMINE and python_calamine is None:
+        logger.warning("python-calamine não está instalado; usando openpyxl em streaming.")
+        motor = MOTOR_OPENPYXL_STREAMING
+
+    inicio = time.perf_counter()
+    if motor == MOTOR_OPENPYXL_STREAMING:
+        df = _ler_openpyxl_streaming(caminho, sheet_name)
+    elif motor in (MOTOR_CALAMINE, MOTOR_OPENPYXL):
+        df = _ler_pandas(caminho, motor, sheet_name)
+    else:
+        raise ValueError(f"Motor de leitura desconhecido: {motor}")
+
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col] = converter_datas(df[col])
+
+    logger.info(
+        "Excel lido com %s: %d linhas x %d colunas em %.1fs",
+        motor, len(df), len(df.columns), time.perf_counter() - inicio
+    )
+    return df
@@ -1,21 +1,109 @@
+import os
+from datetime import datetime
+
 import pandas as pd
-import gdown
 import streamlit as st
 
-@st.cache_data
-def carregar_dados():
-    # ID e caminho temporário
-    file_id = "1nwiU-O9DNjWGJ2C5PMp65uG2YBVoZnxM"
-    output = "/tmp/dados.xlsx"
+from scripts.atualizacao import AtualizadorDados, VersaoDados
+from scripts.compartilhado import RegistroSessoes, somente_leitura
+from scripts.consultas import MOTOR_PANDAS, criar_consultas
+from scripts.download import TransporteDiretorioLocal, TransporteGoogleDrive, atualizar_arquivo
+from scripts.enriquecimento import enriquecer
+from scripts.esquema import aplicar_esquema
+from scripts.leitor_excel import ler_aba_os
+from scripts.snapshot import carregar_ou_gerar_snapshot, ler_snapshot, remover_antigos, snapshot_atual
+
+# ID do arquivo no Google Drive e caminho temporário
+FILE_ID = "1nwiU-O9DNjWGJ2C5PMp65uG2YBVoZnxM"
+ARQUIVO_TEMP = "/tmp/dados.xlsx"
+
+
+def transporte_padrao():
+    """Google Drive, ou uma pasta local se DASHBOARD_ORIGEM_DIR estiver definida."""
+    pasta_local = os.environ.get("DASHBOARD_ORIGEM_DIR")
+    if pasta_local:
+        nome = os.environ.get("DASHBOARD_ORIGEM_ARQUIVO", "dados.xlsx")
+        return TransporteDiretorioLocal(pasta_local, nome)
+    return TransporteGoogleDrive(FILE_ID)
+
+
+def buscar_planilha(destino=ARQUIVO_TEMP, transporte=None):
+    """Atualiza o Excel local, baixando apenas se a origem mudou."""
+    return atualizar_arquivo(transporte or transporte_padrao(), destino)
+
+
+def ler_planilha(caminho, motor=None):
+    """Lê a aba de OS do Excel (só as colunas usadas), aplica o esquema de tipos e as colunas derivadas."""
+    df = ler_aba_os(caminho, motor)
+    return enriquecer(aplicar_esquema(df))
+
+
+def carregar_periodo(data_inicio, data_fim, verificar_origem=True):
+    """OS abertas em [data_inicio, data_fim], lendo só as partições do snapshot que cruzam o período.
 
-    # Download do arquivo
-    gdown.download(f"https://drive.google.com/uc?id={file_id}", output, quiet=False)
+    Com `verificar_origem=False` usa o snapshot já gerado (pelo painel ou por
+    `python -m scripts.snapshot`) sem consultar a origem; só busca a planilha
+    se ainda não houver snapshot.
+    """
+    chave = None if verificar_origem else snapshot_atual()
+    if chave is not None:
+        df = ler_snapshot(chave, data_inicio=data_inicio, data_fim=data_fim)
+    else:
+        busca = buscar_planilha()
+        df = carregar_ou_gerar_snapshot(
+            busca.caminho, ler_planilha, hash_origem=busca.sha256, data_inicio=data_inicio, data_fim=data_fim
+        )
+    fim = pd.Timestamp(data_fim) + pd.Timedelta(days=1)
+    return df[(df['Abertura'] >= pd.Timestamp(data_inicio)) & (df['Abertura'] < fim)]
 
-    # Leitura do Excel
-    df = pd.read_excel(output, sheet_name="Dados sistemas fechadas", engine="openpyxl")
 
-    # Conversão de datas
-    df['Abertura'] = pd.to_datetime(df['Abertura'], errors='coerce')
-    df['Fechamento'] = pd.to_datetime(df['Fechamento'], errors='coerce')
+def os_validas(df):
+    """OS com cliente preenchido (diferente de '-')."""
+    return df[df['CLIENTE'].notna() & (df['CLIENTE'].str.strip() != "-")]
+
+
+def montar_versao(anterior=None):
+    """Nova versão dos dados (snapshot, OS válidas e consultas), ou `anterior` se a origem não mudou.
+
+    Com uma versão anterior a ingestão é incremental: só os meses com OS
+    novas ou alteradas são regravados no snapshot e reagregados no cubo.
+    """
+    busca = buscar_planilha()
+    if anterior is not None and anterior.sha256 == busca.sha256:
+        return anterior
+
+    snapshot = carregar_ou_gerar_snapshot(
+        busca.caminho, ler_planilha, hash_origem=busca.sha256,
+        anterior=anterior.versao if anterior is not None else None
+    )
+    # Só o recorte de OS válidas fica em memória; o snapshot completo é descartado aqui
+    df = somente_leitura(os_validas(snapshot))
+    consultas = criar_consultas(
+        df,
+        anterior=anterior.consultas if anterior is not None else None,
+        meses_alterados=snapshot.attrs.get('meses_alterados')
+    )
+    return VersaoDados(
+        versao=snapshot.attrs.get('versao_snapshot'),
+        sha256=busca.sha256,
+        # Com motor SQL as OS ficam só no banco embutido; o DataFrame não é guardado
+        df=df if consultas.motor == MOTOR_PANDAS else None,
+        consultas=consultas,
+        carregado_em=datetime.now(),
+    )
+
+
+@st.cache_resource
+def atualizador_dados():
+    """Atualizador do processo: serve a versão atual e busca novas versões em segundo plano."""
+    return AtualizadorDados(montar_versao, podar=remover_antigos).iniciar()
+
+
+def carregar_dados():
+    """DataFrame de OS completo da versão atual, lido do snapshot (não fica em memória no processo)."""
+    return ler_snapshot(atualizador_dados().atual().versao)
+
 
-    return df
+@st.cache_resource
+def registro_sessoes():
+    return RegistroSessoes()
@@ -0,0 +1,137 @@
+# scripts/metricas.py
+
+"""Métricas de OS compartilhadas por app.py, painel_sistemas.py e enviar_ranking.py.
+
+Todas as funções recebem uma "base" no formato do cubo (ver scripts/cubo.py):
+um recorte do cubo mensal ou `construir_cubo(df_filtrado)`, que agrega as
+linhas em uma única passada. A partir dela os totais, rankings e séries
+mensais saem de groupbys sobre poucos grupos, e as três telas reportam
+exatamente os mesmos números.
+"""
+
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from scripts.cubo import agregar
+from scripts.enriquecimento import mes_para_data
+
+# Situações consideradas nas métricas
+STATUS_VALIDOS = ['Aberta', 'Pendente', 'Fechada']
+STATUS_PENDENTES = ['Aberta', 'Pendente']
+
+# Tipos de métrica de conclusão
+METRICA_MESMO_MES = "mesmo_mes"
+METRICA_TODAS = "todas_fechadas"
+
+# Rótulos usados no seletor de métrica dos painéis
+OPCOES_METRICA = {
+    "Fechadas no mesmo mês da abertura": METRICA_MESMO_MES,
+    "Todas as OS fechadas": METRICA_TODAS,
+}
+
+
+def coluna_fechadas(metrica):
+    """Medida do cubo que conta as OS concluídas conforme a métrica."""
+    return 'Fechadas_Mesmo_Mes' if metrica == METRICA_MESMO_MES else 'Fechadas'
+
+
+def somente_validas(base):
+    return base[base['SITUAÇÃO OS'].isin(STATUS_VALIDOS)]
+
+
+@dataclass
+class ResumoOS:
+    """Valores dos cards: total, pendentes, concluídas e % de conclusão."""
+
+    total: int
+    pendentes: int
+    concluidas: int
+
+    @property
+    def taxa(self):
+        return (self.concluidas / self.total * 100) if self.total > 0 else 0
+
+    @property
+    def taxa_formatada(self):
+        return f"{self.taxa:.1f}%".replace('.', ',')
+
+
+def resumo(base, metrica):
+    validas = somente_validas(base)
+    pendentes = validas.loc[validas['SITUAÇÃO OS'].isin(STATUS_PENDENTES), 'Total'].sum()
+    return ResumoOS(
+        total=int(validas['Total'].sum()),
+        pendentes=int(pendentes),
+        concluidas=int(validas[coluna_fechadas(metrica)].sum()),
+    )
+
+
+def ranking_conclusao(base, coluna, metrica):
+    """Ranking de % de conclusão por `coluna` (Classificação, coluna, Abertas, Fechadas, % Conclusão)."""
+    ranking = agregar(somente_validas(base), coluna)[[coluna, 'Total', coluna_fechadas(metrica)]]
+    ranking.columns = [coluna, 'Abertas', 'Fechadas']
+    ranking['% Conclusão'] = (ranking['Fechadas'] / ranking['Abertas']) * 100
+    ranking = ranking.sort_values(by='% Conclusão', ascending=False).reset_index(drop=True)
+    ranking['Classificação'] = ranking.index + 1
+    return ranking[['Classificação', coluna, 'Abertas', 'Fechadas', '% Conclusão']]
+
+
+def _rotular_meses(serie):
+    """Acrescenta as colunas de data e rótulo ('Jan/25') a partir de Mes_Abertura."""
+    serie = serie.sort_values('Mes_Abertura').reset_index(drop=True)
+    serie['Mes_Ano_Date'] = mes_para_data(serie['Mes_Abertura'])
+    serie['Mes_Ano'] = serie['Mes_Ano_Date'].dt.strftime('%Y-%m')
+    serie['Mes_Ano_Formatado'] = serie['Mes_Ano_Date'].dt.strftime('%b/%y').str.capitalize()
+    return serie
+
+
+def serie_mensal(base, metrica):
+    """Abertas, fechadas e % de conclusão por mês de abertura (KPI e evolução)."""
+    mensal = agregar(somente_validas(base), 'Mes_Abertura')[['Mes_Abertura', 'Total', coluna_fechadas(metrica)]]
+    mensal.columns = ['Mes_Abertura', 'Total', 'Fechadas']
+    mensal['% Conclusão'] = (mensal['Fechadas'] / mensal['Total']) * 100
+    return _rotular_meses(mensal)
+
+
+def tempo_medio_mensal(base):
+    """Tempo médio (dias) entre abertura e fechamento, por mês de abertura."""
+    mensal = agregar(base, 'Mes_Abertura')
+    mensal = mensal[mensal['Qtd_Tempo'] > 0]
+    mensal['Tempo (dias)'] = (mensal['Soma_Tempo'] / mensal['Qtd_Tempo']).round(1)
+    return _rotular_meses(mensal[['Mes_Abertura', 'Tempo (dias)']])
+
+
+def backlog_mensal(base):
+    """OS abertas/pendentes por mês de abertura."""
+    pendentes = base[base['SITUAÇÃO OS'].isin(STATUS_PENDENTES)]
+    mensal = agregar(pendentes, 'Mes_Abertura')[['Mes_Abertura', 'Total']]
+    mensal.columns = ['Mes_Abertura', 'Backlog']
+    return _rotular_meses(mensal)
+
+
+def ranking_pendencias(base):
+    """Quantidade de OS abertas/pendentes por tipo de pendência."""
+    pendentes = base[base['SITUAÇÃO OS'].isin(STATUS_PENDENTES)]
+    ranking = agregar(pendentes, 'PENDÊNCIAS EM ABERTO')[['PENDÊNCIAS EM ABERTO', 'Total']]
+    ranking = ranking.sort_values('Total', ascending=False, kind='stable').reset_index(drop=True)
+    ranking.columns = ['Tipo de Pendência', 'Quantidade']
+    return ranking
+
+
+@dataclass
+class MetricasPainel:
+    """Tudo que os painéis exibem para uma seleção, calculado a partir da mesma base."""
+
+    resumo: ResumoOS
+    mensal: pd.DataFrame
+    rankings: dict = field(default_factory=dict)
+
+
+def calcular_metricas(base, metrica, colunas_ranking=('CLIENTE', 'TIPO DE MANUTENÇÃO2')):
+    """Cards, série mensal e rankings de conclusão de uma só vez."""
+    return MetricasPainel(
+        resumo=resumo(base, metrica),
+        mensal=serie_mensal(base, metrica),
+        rankings={col: ranking_conclusao(base, col, metrica) for col in colunas_ranking},
+    )
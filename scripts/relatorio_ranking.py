@@ -0,0 +1,274 @@
+# scripts/relatorio_ranking.py
+
+"""Relatório de ranking de conclusão de OS por cliente, sem Streamlit.
+
+Gera o HTML do relatório institucional (cards + ranking por cliente) para
+qualquer combinação de meses de abertura e grupos de destinatários. Os dados
+vêm do snapshot Parquet (só as partições dos meses pedidos) e são agregados
+uma única vez num cubo mês x situação x cliente (+ as colunas usadas nos
+filtros dos grupos); cada relatório é só um recorte desse cubo. Grupos com os
+mesmos filtros compartilham o mesmo relatório.
+
+As métricas são as de scripts/metricas.py, as mesmas dos painéis. O HTML sai
+de templates, e as linhas da tabela são montadas coluna a coluna (sem
+iterrows).
+"""
+
+import html
+import re
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from scripts import metricas
+from scripts.cubo import construir_cubo
+from scripts.leitura_dados import carregar_periodo, os_validas
+
+# Tipos de manutenção considerados no relatório (comparação sem maiúsculas)
+TIPOS_PADRAO = ('calibração', 'preventiva', 'tse', 'qualificação')
+
+# Como cada tipo aparece no texto do relatório
+ROTULOS_TIPOS = {'calibração': 'Calibração', 'preventiva': 'Preventiva', 'tse': 'TSE', 'qualificação': 'Qualificação'}
+
+# % de conclusão a partir da qual o cliente aparece como ✅
+META_CONCLUSAO = 90
+
+URL_DASHBOARD = "https://dashbordoperacional.streamlit.app/"
+
+MESES_PT = {
+    1: 'janeiro', 2: 'fevereiro', 3: 'março', 4: 'abril',
+    5: 'maio', 6: 'junho', 7: 'julho', 8: 'agosto',
+    9: 'setembro', 10: 'outubro', 11: 'novembro', 12: 'dezembro'
+}
+
+TITULOS_METRICA = {
+    metricas.METRICA_MESMO_MES: "Fechadas no mesmo mês",
+    metricas.METRICA_TODAS: "Fechadas no mês (qualquer abertura)",
+}
+
+TEMPLATE_CARDS = """
+<div style="font-family:'Segoe UI', Tahoma, sans-serif; margin-bottom:30px;">
+  <h2 style="color:#1B556B; font-size:22px;">Relatório Institucional - Desempenho Operacional ({data_ref}){titulo_grupo}</h2>
+  <p style="font-size:15px; color:#333; margin-bottom:20px;">
+    Este relatório apresenta os indicadores de desempenho relacionados às <strong>ordens de serviço abertas e finalizadas no mês</strong>, abrangendo as categorias de manutenção {tipos}.
+  </p>
+  <p style="font-size:14px; color:#555; font-style:italic;">Departamento de Operações · Orbis Engenharia Clínica</p>
+  <div style="display:flex; gap:15px; flex-wrap:wrap;">
+    <div style="flex:1; min-width:150px; background:#E8F0FE; padding:20px; border-radius:12px; border-left:5px solid #1B556B;">
+      <p style="margin:0; font-size:13px;">Total de OS Abertas</p>
+      <h3 style="margin:0; font-size:22px;">{total}</h3>
+    </div>
+    <div style="flex:1; min-width:150px; background:#D4EDDA; padding:20px; border-radius:12px; border-left:5px solid #28A745;">
+      <p style="margin:0; font-size:13px;">{titulo_metrica}</p>
+      <h3 style="margin:0; font-size:22px;">{concluidas}</h3>
+    </div>
+    <div style="flex:1; min-width:150px; background:#FFF3CD; padding:20px; border-radius:12px; border-left:5px solid #FFC107;">
+      <p style="margin:0; font-size:13px;">% Conclusão</p>
+      <h3 style="margin:0; font-size:22px;">{taxa:.1f}%</h3>
+    </div>
+  </div>
+</div>
+"""
+
+TEMPLATE_TABELA = """
+<h3 style='color:#1B556B;'>🏅 Ranking de Conclusão por Cliente</h3>
+<table style="width:100%; border-collapse: separate; border-spacing: 0; font-family: 'Segoe UI', Tahoma, sans-serif;">
+    <thead style="background-color:#1B556B; color:white;">
+        <tr>
+            <th style="padding:12px; border:1px solid #ccc; border-top-left-radius: 10px;">Classificação</th>
+            <th style="padding:12px; border:1px solid #ccc;">Cliente</th>
+            <th style="padding:12px; border:1px solid #ccc;">Abertas</th>
+            <th style="padding:12px; border:1px solid #ccc;">Fechadas</th>
+            <th style="padding:12px; border:1px solid #ccc; border-top-right-radius: 10px;">% Conclusão</th>
+        </tr>
+    </thead>
+    <tbody>
+{linhas}
+    </tbody>
+</table>
+"""
+
+TEMPLATE_PAGINA = """
+<html>
+  <head><meta charset="utf-8"></head>
+  <body style="font-family:'Segoe UI', Tahoma, sans-serif;">
+    {cards}
+    {tabela}
+    <div style="text-align:center; margin:30px 0;">
+      <a href="{url_dashboard}" target="_blank" style="background-color:#1B556B; color:white; padding:12px 24px; border-radius:8px; text-decoration:none; font-size:15px; font-weight:bold; font-family:'Segoe UI', sans-serif;">
+        📊 Acessar Dashboard
+      </a>
+    </div>
+    <div style="margin-top:40px; font-size:12px; color:#999; text-align:center;">
+      Desenvolvido por Matheus Pires · Mensagem automática do sistema
+    </div>
+  </body>
+</html>
+"""
+
+_CELULA = '<td style="padding:10px; border:1px solid #ccc;">'
+_CELULA_CENTRO = '<td style="padding:10px; border:1px solid #ccc; text-align:center;">'
+
+
+@dataclass(frozen=True)
+class GrupoDestinatarios:
+    """Destinatários de um relatório e o recorte que eles recebem (coluna -> valores)."""
+
+    nome: str
+    destinatarios: tuple
+    filtros: dict = field(default_factory=dict, hash=False)
+
+    @property
+    def chave_filtros(self):
+        return tuple(sorted((col, tuple(sorted(map(str, valores)))) for col, valores in self.filtros.items()))
+
+
+@dataclass
+class Relatorio:
+    """Um relatório pronto: mês, grupo, números e o HTML."""
+
+    mes: int
+    grupo: GrupoDestinatarios
+    metrica: str
+    resumo: metricas.ResumoOS
+    ranking: pd.DataFrame
+    html: str
+
+    @property
+    def data_ref(self):
+        return rotulo_mes(self.mes)
+
+    @property
+    def assunto(self):
+        return f"📊 Departamento de Operações - Relatório de Conclusão de OS ({self.data_ref})"
+
+    @property
+    def nome_arquivo(self):
+        """Nome base dos arquivos do relatório (sem extensão)."""
+        grupo = re.sub(r'[^0-9A-Za-z]+', '_', self.grupo.nome).strip('_') or 'geral'
+        return f"ranking_OS_{self.mes}_{grupo}"
+
+
+def rotulo_mes(mes):
+    """'Agosto de 2025' a partir de 202508."""
+    return f"{MESES_PT[mes % 100].capitalize()} de {mes // 100}"
+
+
+def mes_de_texto(texto):
+    """Mês AAAAMM a partir de '202508' ou '2025-08'."""
+    digitos = str(texto).replace('-', '').replace('/', '')
+    mes = int(digitos)
+    if not (1 <= mes % 100 <= 12) or len(digitos) != 6:
+        raise ValueError(f"Mês inválido: {texto} (use AAAAMM ou AAAA-MM)")
+    return mes
+
+
+def mes_atual():
+    return int(date.today().strftime('%Y%m'))
+
+
+def periodo_dos_meses(meses):
+    """Primeiro dia do menor mês e último dia do maior."""
+    inicio = pd.Timestamp(year=min(meses) // 100, month=min(meses) % 100, day=1)
+    fim = pd.Timestamp(year=max(meses) // 100, month=max(meses) % 100, day=1) + pd.offsets.MonthEnd(0)
+    return inicio.date(), fim.date()
+
+
+def dados_relatorio(meses, tipos=TIPOS_PADRAO, verificar_origem=True):
+    """OS válidas dos meses pedidos e dos tipos de manutenção do relatório."""
+    df = os_validas(carregar_periodo(*periodo_dos_meses(meses), verificar_origem=verificar_origem))
+    if tipos:
+        df = df[df['TIPO DE MANUTENÇÃO2'].str.lower().isin([t.lower() for t in tipos])]
+    return df[df['Mes_Abertura'].isin(meses)]
+
+
+def linhas_tabela(ranking):
+    """Linhas <tr> do ranking, montadas coluna a coluna."""
+    if ranking.empty:
+        return ""
+
+    percentual = ranking['% Conclusão']
+    texto_percentual = np.where(
+        percentual >= META_CONCLUSAO,
+        "<span style='color:#155724;'>✅ ",
+        "<span style='color:#721c24;'>❌ "
+    ) + percentual.map('{:.1f}%'.format) + "</span>"
+
+    clientes = ranking['CLIENTE'].astype(str).map(html.escape)
+    linhas = (
+        '    <tr style="font-size:14px;">'
+        + _CELULA_CENTRO + ranking['Classificação'].astype(int).astype(str) + '</td>'
+        + _CELULA + clientes + '</td>'
+        + _CELULA_CENTRO + ranking['Abertas'].astype(int).astype(str) + '</td>'
+        + _CELULA_CENTRO + ranking['Fechadas'].astype(int).astype(str) + '</td>'
+        + _CELULA_CENTRO + texto_percentual + '</td>'
+        + '</tr>'
+    )
+    return "\n".join(linhas)
+
+
+def _enumerar(itens):
+    """'A, B e C'."""
+    itens = list(itens)
+    return ", ".join(itens[:-1]) + f" e {itens[-1]}" if len(itens) > 1 else "".join(itens)
+
+
+def descrever_filtros(filtros):
+    """Recorte do relatório em texto ('Coordenador 1 · Região 2'); vazio sem filtros."""
+    return " · ".join(_enumerar(map(str, valores)) for valores in filtros.values())
+
+
+def renderizar_html(mes, resumo, ranking, metrica, tipos=TIPOS_PADRAO, filtros=None):
+    """HTML completo do relatório (corpo do e-mail e fonte do PDF)."""
+    tipos = [f"<strong>{html.escape(ROTULOS_TIPOS.get(t.lower(), t))}</strong>" for t in tipos]
+    recorte = descrever_filtros(filtros or {})
+    cards = TEMPLATE_CARDS.format(
+        data_ref=rotulo_mes(mes),
+        titulo_grupo=f" · {html.escape(recorte)}" if recorte else "",
+        tipos=_enumerar(tipos) or "<strong>todas</strong>",
+        total=resumo.total,
+        titulo_metrica=TITULOS_METRICA[metrica],
+        concluidas=resumo.concluidas,
+        taxa=resumo.taxa,
+    )
+    tabela = TEMPLATE_TABELA.format(linhas=linhas_tabela(ranking))
+    return TEMPLATE_PAGINA.format(cards=cards, tabela=tabela, url_dashboard=URL_DASHBOARD)
+
+
+def _recortar(base, filtros):
+    for col, valores in filtros.items():
+        base = base[base[col].isin(valores)]
+    return base
+
+
+def gerar_relatorios(meses, grupos, metrica=metricas.METRICA_MESMO_MES, tipos=TIPOS_PADRAO, df=None,
+                     verificar_origem=True):
+    """Um Relatorio por mês e grupo, a partir de uma única leitura e agregação dos dados.
+
+    `df` permite passar as OS já carregadas (por exemplo, em benchmarks);
+    sem ele, os meses pedidos são lidos do snapshot.
+    """
+    meses = sorted({int(m) for m in meses})
+    if df is None:
+        df = dados_relatorio(meses, tipos, verificar_origem)
+
+    colunas_filtro = sorted({col for grupo in grupos for col in grupo.filtros} - {'CLIENTE'})
+    cubo = construir_cubo(df, dimensoes=['Mes_Abertura', 'SITUAÇÃO OS', 'CLIENTE'] + colunas_filtro)
+
+    relatorios, prontos = [], {}
+    for mes in meses:
+        base_mes = cubo[cubo['Mes_Abertura'] == mes]
+        for grupo in grupos:
+            chave = (mes, grupo.chave_filtros)
+            if chave not in prontos:
+                base = _recortar(base_mes, grupo.filtros)
+                resumo = metricas.resumo(base, metrica)
+                ranking = metricas.ranking_conclusao(base, 'CLIENTE', metrica)
+                conteudo = renderizar_html(mes, resumo, ranking, metrica, tipos, grupo.filtros)
+                prontos[chave] = (resumo, ranking, conteudo)
+
+            resumo, ranking, conteudo = prontos[chave]
+            relatorios.append(Relatorio(mes, grupo, metrica, resumo, ranking, conteudo))
+    return relatorios
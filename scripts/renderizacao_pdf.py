@@ -0,0 +1,392 @@
+# scripts/renderizacao_pdf.py
+
+"""Renderização de relatórios HTML em PDF, em lote e em paralelo.
+
+- Os relatórios são distribuídos num pool limitado de processos
+  (`processos`), cada um com tempo máximo (`timeout`) próprio.
+- Cada PDF fica num cache indexado pelo hash do HTML (PDF_CACHE_DIR):
+  um relatório que não mudou nunca é renderizado de novo, e HTMLs
+  idênticos no mesmo lote são renderizados uma única vez.
+
+Motores:
+
+- wkhtmltopdf: o executável, chamado direto (HTML pela entrada padrão, PDF
+  pela saída) para que o timeout mate o processo
+- python: conversor em Python puro, sem dependências, para máquinas sem o
+  wkhtmltopdf; mantém títulos, parágrafos e tabelas em texto (Helvetica),
+  sem cores nem CSS
+
+O motor vem do argumento, da variável DASHBOARD_MOTOR_PDF ou, por padrão, é o
+wkhtmltopdf se estiver instalado e o python caso contrário. Vazão por
+tamanho do pool:
+
+    python -m scripts.renderizacao_pdf --relatorios 40 --processos 1 2 4
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+from config.paths import PDF_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+MOTOR_WKHTMLTOPDF = "wkhtmltopdf"
+MOTOR_PYTHON = "python"
+
+MOTORES = [MOTOR_WKHTMLTOPDF, MOTOR_PYTHON]
+
+# Muda quando a saída de algum motor muda, invalidando o cache
+VERSAO_CACHE = 1
+
+TIMEOUT_PADRAO = 60
+
+
+def motor_padrao():
+    motor = os.environ.get("DASHBOARD_MOTOR_PDF")
+    if motor:
+        return motor
+    return MOTOR_WKHTMLTOPDF if shutil.which("wkhtmltopdf") else MOTOR_PYTHON
+
+
+def chave_pdf(html, motor):
+    """Hash do conteúdo que identifica o PDF no cache."""
+    return hashlib.sha256(f"v{VERSAO_CACHE}|{motor}|{html}".encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Conversor em Python puro
+# ---------------------------------------------------------------------------
+
+_BLOCOS = {"h1": 18, "h2": 15, "h3": 13, "p": 10, "div": 10, "li": 10}
+_IGNORADAS = {"head", "style", "script", "title"}
+
+# Largura média de um caractere da Helvetica, em fração do tamanho da fonte
+_LARGURA_CARACTERE = 0.5
+
+_PAGINA = (595, 842)  # A4 em pontos
+_MARGEM = 40
+
+
+class _ExtratorHTML(HTMLParser):
+    """Reduz o HTML a uma sequência de blocos: ('texto', tamanho, negrito, texto) e ('linha', celulas, cabecalho)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocos = []
+        self._texto = []
+        self._tamanhos = []
+        self._ignorando = 0
+        self._linha = None
+        self._celula = None
+        self._cabecalho = False
+
+    def _fechar_texto(self):
+        texto = " ".join("".join(self._texto).split())
+        self._texto = []
+        if texto:
+            tamanho = self._tamanhos[-1] if self._tamanhos else 10
+            self.blocos.append(("texto", tamanho, tamanho > 10, texto))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _IGNORADAS:
+            self._ignorando += 1
+        elif tag == "tr":
+            self._fechar_texto()
+            self._linha, self._cabecalho = [], False
+        elif tag in ("td", "th") and self._linha is not None:
+            self._celula = []
+            self._cabecalho |= tag == "th"
+        elif tag == "br":
+            self._fechar_texto()
+        elif tag in _BLOCOS:
+            self._fechar_texto()
+            self._tamanhos.append(_BLOCOS[tag])
+
+    def handle_endtag(self, tag):
+        if tag in _IGNORADAS:
+            self._ignorando = max(0, self._ignorando - 1)
+        elif tag in ("td", "th") and self._celula is not None:
+            self._linha.append(" ".join("".join(self._celula).split()))
+            self._celula = None
+        elif tag == "tr" and self._linha is not None:
+            if self._linha:
+                self.blocos.append(("linha", self._linha, self._cabecalho))
+            self._linha = None
+        elif tag in _BLOCOS:
+            self._fechar_texto()
+            if self._tamanhos:
+                self._tamanhos.pop()
+
+    def handle_data(self, dados):
+        if self._ignorando:
+            return
+        if self._celula is not None:
+            self._celula.append(dados)
+        elif self._linha is None:
+            self._texto.append(dados)
+
+    def close(self):
+        super().close()
+        self._fechar_texto()
+
+
+def _texto_pdf(texto):
+    """Texto em WinAnsi (cp1252) escapado para string PDF; caracteres fora dele (emojis) saem."""
+    dados = texto.encode("cp1252", "ignore").strip()
+    return b"(" + dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _quebrar(texto, tamanho, largura):
+    maximo = max(1, int(largura / (tamanho * _LARGURA_CARACTERE)))
+    linhas, atual = [], ""
+    for palavra in texto.split():
+        if atual and len(atual) + 1 + len(palavra) > maximo:
+            linhas.append(atual)
+            atual = palavra
+        else:
+            atual = f"{atual} {palavra}" if atual else palavra
+    if atual:
+        linhas.append(atual)
+    return linhas
+
+
+def _paginas(blocos):
+    """Comandos de texto de cada página."""
+    largura_util = _PAGINA[0] - 2 * _MARGEM
+    paginas, comandos = [], []
+    y = _PAGINA[1] - _MARGEM
+
+    def escrever(x, tamanho, negrito, texto):
+        comandos.append(
+            b"BT /F%d %d Tf %.1f %.1f Td " % (2 if negrito else 1, tamanho, x, y) + _texto_pdf(texto) + b" Tj ET"
+        )
+
+    for bloco in blocos:
+        if bloco[0] == "texto":
+            _, tamanho, negrito, texto = bloco
+            linhas = _quebrar(texto, tamanho, largura_util)
+            altura = tamanho * 1.4
+        else:
+            _, celulas, negrito = bloco
+            tamanho, altura = 9, 9 * 1.8
+            linhas = [celulas]
+
+        for linha in linhas:
+            if y - altura < _MARGEM:
+                paginas.append(comandos)
+                comandos, y = [], _PAGINA[1] - _MARGEM
+            y -= altura
+            if bloco[0] == "texto":
+                escrever(_MARGEM, tamanho, negrito, linha)
+                continue
+
+            # Linha de tabela: colunas de mesma largura, texto cortado para caber
+            largura_coluna = largura_util / len(linha)
+            caracteres = max(1, int(largura_coluna / (tamanho * _LARGURA_CARACTERE)) - 1)
+            for i, celula in enumerate(linha):
+                escrever(_MARGEM + i * largura_coluna, tamanho, negrito, celula[:caracteres])
+            comandos.append(b"0.8 G %.1f %.1f m %.1f %.1f l S" % (
+                _MARGEM, y - 4, _MARGEM + largura_util, y - 4
+            ))
+        y -= 4
+
+    paginas.append(comandos)
+    return paginas
+
+
+def html_para_pdf(html):
+    """PDF (bytes) com o texto, títulos e tabelas do HTML, em Python puro."""
+    extrator = _ExtratorHTML()
+    extrator.feed(html)
+    extrator.close()
+    paginas = _paginas(extrator.blocos)
+
+    # Objetos: 1 catálogo, 2 árvore de páginas, 3-4 fontes, depois (página, conteúdo) por página
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    filhos = []
+    for comandos in paginas:
+        conteudo = b"\n".join(comandos)
+        numero_pagina = len(objetos) + 1
+        filhos.append(b"%d 0 R" % numero_pagina)
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+            % (_PAGINA[0], _PAGINA[1], numero_pagina + 1)
+        )
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+    objetos[1] = b"<< /Type /Pages /Kids [" + b" ".join(filhos) + b"] /Count %d >>" % len(filhos)
+
+    saida = bytearray(b"%PDF-1.4\n")
+    posicoes = []
+    for numero, objeto in enumerate(objetos, start=1):
+        posicoes.append(len(saida))
+        saida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    saida += b"".join(b"%010d 00000 n \n" % posicao for posicao in posicoes)
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(saida)
+
+
+# ---------------------------------------------------------------------------
+# Renderização em lote
+# ---------------------------------------------------------------------------
+
+def _wkhtmltopdf(html, timeout):
+    executavel = shutil.which("wkhtmltopdf")
+    if executavel is None:
+        raise RuntimeError("wkhtmltopdf não encontrado no PATH")
+    processo = subprocess.run(
+        [executavel, "--quiet", "--encoding", "utf-8", "-", "-"],
+        input=html.encode("utf-8"), capture_output=True, timeout=timeout, check=True
+    )
+    return processo.stdout
+
+
+def _estourou_tempo(signum, frame):
+    raise TimeoutError("tempo de renderização esgotado")
+
+
+def renderizar(html, motor, timeout=TIMEOUT_PADRAO):
+    """PDF (bytes) de um HTML. Roda dentro dos processos do pool."""
+    if motor == MOTOR_WKHTMLTOPDF:
+        return _wkhtmltopdf(html, timeout)
+    if motor != MOTOR_PYTHON:
+        raise ValueError(f"Motor de PDF desconhecido: {motor}")
+
+    # O conversor em Python é interrompido por alarme (onde houver setitimer)
+    if not timeout or not hasattr(signal, "setitimer"):
+        return html_para_pdf(html)
+    anterior = signal.signal(signal.SIGALRM, _estourou_tempo)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return html_para_pdf(html)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+@dataclass
+class ResultadoRenderizacao:
+    gerados: list = field(default_factory=list)    # caminhos renderizados agora
+    do_cache: list = field(default_factory=list)   # caminhos copiados do cache
+    falhas: list = field(default_factory=list)     # (caminho, erro)
+    segundos: float = 0.0
+
+    @property
+    def por_segundo(self):
+        total = len(self.gerados) + len(self.do_cache)
+        return total / self.segundos if self.segundos else 0.0
+
+
+def _gravar(caminho, conteudo):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def renderizar_pdfs(trabalhos, processos=None, motor=None, timeout=TIMEOUT_PADRAO, cache=PDF_CACHE_DIR):
+    """Grava o PDF de cada (html, caminho) de `trabalhos`.
+
+    Só os HTMLs sem PDF no cache vão para o pool (cada conteúdo uma única
+    vez); os demais são copiados do cache. Falhas e timeouts não interrompem
+    o lote e ficam em `falhas`.
+    """
+    motor = motor or motor_padrao()
+    resultado = ResultadoRenderizacao()
+    inicio = time.perf_counter()
+
+    pendentes = {}  # chave -> (html, [caminhos])
+    for html, caminho in trabalhos:
+        chave = chave_pdf(html, motor)
+        em_cache = os.path.join(cache, f"{chave}.pdf") if cache else None
+        if em_cache and os.path.exists(em_cache):
+            shutil.copyfile(em_cache, caminho)
+            resultado.do_cache.append(caminho)
+        else:
+            pendentes.setdefault(chave, (html, []))[1].append(caminho)
+
+    if pendentes:
+        with ProcessPoolExecutor(max_workers=min(processos or os.cpu_count() or 1, len(pendentes))) as pool:
+            futuros = {
+                pool.submit(renderizar, html, motor, timeout): (chave, caminhos)
+                for chave, (html, caminhos) in pendentes.items()
+            }
+            for futuro in as_completed(futuros):
+                chave, caminhos = futuros[futuro]
+                try:
+                    conteudo = futuro.result()
+                except Exception as erro:
+                    logger.error("Falha ao renderizar %s com %s: %s", caminhos[0], motor, erro)
+                    resultado.falhas.extend((caminho, erro) for caminho in caminhos)
+                    continue
+                if cache:
+                    _gravar(os.path.join(cache, f"{chave}.pdf"), conteudo)
+                for caminho in caminhos:
+                    _gravar(caminho, conteudo)
+                resultado.gerados.extend(caminhos)
+
+    resultado.segundos = time.perf_counter() - inicio
+    logger.info(
+        "PDFs com %s: %d renderizados, %d do cache, %d falhas em %.1fs",
+        motor, len(resultado.gerados), len(resultado.do_cache), len(resultado.falhas), resultado.segundos
+    )
+    return resultado
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    from scripts.enriquecimento import enriquecer
+    from scripts.esquema import aplicar_esquema
+    from scripts.leitura_dados import os_validas
+    from scripts.relatorio_ranking import GrupoDestinatarios, gerar_relatorios
+    from scripts.sintetico import gerar_os
+
+    parser = argparse.ArgumentParser(description="Vazão da renderização de PDFs (relatórios por segundo) por tamanho do pool.")
+    parser.add_argument("--relatorios", type=int, default=40, help="Relatórios distintos (um por cliente)")
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--motor", choices=MOTORES, default=None)
+    parser.add_argument("--linhas", type=int, default=200_000, help="OS sintéticas usadas nos relatórios")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    motor = args.motor or motor_padrao()
+
+    df = os_validas(enriquecer(aplicar_esquema(gerar_os(args.linhas))))
+    meses = sorted(df['Mes_Abertura'].unique())[-3:]
+    df = df[df['Mes_Abertura'].isin(meses)]
+    clientes = sorted(df['CLIENTE'].astype(str).unique())
+    grupos = [GrupoDestinatarios(c, (), {'CLIENTE': [c]}) for c in clientes]
+    relatorios = gerar_relatorios(meses, grupos, df=df)[:args.relatorios]
+
+    with tempfile.TemporaryDirectory() as pasta:
+        trabalhos = [(r.html, os.path.join(pasta, f"{r.nome_arquivo}.pdf")) for r in relatorios]
+        print(f"{len(trabalhos)} relatórios, motor {motor}")
+        for processos in args.processos:
+            cache = os.path.join(pasta, f"cache_{processos}")
+            frio = renderizar_pdfs(trabalhos, processos, motor, cache=cache)
+            quente = renderizar_pdfs(trabalhos, processos, motor, cache=cache)
+            print(
+                f"{processos} processo(s): {frio.por_segundo:.1f} relatórios/s "
+                f"({frio.segundos:.2f}s, {len(frio.falhas)} falha(s)); "
+                f"com cache: {quente.por_segundo:.1f}/s"
+            )
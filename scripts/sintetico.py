@@ -0,0 +1,265 @@
+# scripts/sintetico.py
+
+"""OS sintéticas e determinísticas (Excel ou Parquet) para benchmarks.
+
+Gera a aba "Dados sistemas fechadas" com as colunas usadas pelos painéis e
+colunas extras (equipamento, técnico, descrição...) que existem na planilha
+real mas não são lidas, para medir a projeção de colunas. As cardinalidades
+e distribuições imitam a planilha real:
+
+- ~40 clientes com volumes bem desiguais; supervisor, coordenador, região,
+  cidade e grupo fixos por cliente
+- mais aberturas nos meses recentes, em horário comercial e sem domingos
+- OS antigas quase sempre fechadas, recentes ainda abertas ou pendentes,
+  com tempo de atendimento log-normal
+- causa, ocorrência e pendência digitadas com variações de caixa, espaços e
+  acentos; Nº Chamado misturando números, códigos e vazios
+
+A mesma semente gera sempre os mesmos dados. As linhas são geradas em blocos
+e o Parquet é gravado bloco a bloco, então 10 milhões de linhas cabem na
+memória de um bloco. O Excel comporta no máximo 1.048.575 linhas por aba.
+
+    python -m scripts.sintetico /tmp/os_100k.xlsx --linhas 100k
+    python -m scripts.sintetico /tmp/os_10m.parquet --linhas 10m
+"""
+
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+
+from config.paths import SHEET_NAME
+from scripts.leitor_excel import colunas_usadas
+
+# Tamanhos padrão dos benchmarks
+TAMANHOS = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+LIMITE_LINHAS_EXCEL = 1_048_575
+TAMANHO_BLOCO = 250_000
+
+TIPOS = {'Corretiva': 0.45, 'Preventiva': 0.25, 'Calibração': 0.15, 'TSE': 0.05, 'Qualificação': 0.05, 'Instalação': 0.05}
+SITUACOES_ABERTAS = {'Aberta': 0.45, 'Pendente': 0.5, 'Cancelada': 0.05}
+PENDENCIAS = [
+    'Aguardando peça', 'Aguardando cliente', 'Aguardando orçamento', 'Aguardando aprovação',
+    'Em análise', 'Aguardando fornecedor', 'Equipamento em uso', 'Aguardando agendamento',
+]
+CAUSAS = [
+    'Cabo rompido', 'Bateria descarregada', 'Desgaste natural', 'Mau uso', 'Queda do equipamento',
+    'Falha eletrônica', 'Sensor danificado', 'Conector oxidado', 'Fonte queimada', 'Display danificado',
+    'Vazamento de fluido', 'Obstrução', 'Software desatualizado', 'Calibração vencida', 'Peça quebrada',
+    'Infiltração de líquido', 'Mau contato', 'Sobreaquecimento', 'Fusível queimado', 'Sem defeito constatado',
+]
+OCORRENCIAS = [
+    'Não liga', 'Alarme falso', 'Erro de leitura', 'Ruído anormal', 'Sem imagem', 'Vazamento',
+    'Não carrega', 'Travando', 'Tela apagada', 'Aquecendo', 'Erro de comunicação',
+    'Bateria não segura carga', 'Botão não funciona', 'Pressão incorreta', 'Impressora não imprime',
+]
+EQUIPAMENTOS = [
+    'Monitor multiparamétrico', 'Bomba de infusão', 'Ventilador pulmonar', 'Desfibrilador', 'Autoclave',
+    'Eletrocardiógrafo', 'Oxímetro', 'Cardioversor', 'Incubadora', 'Foco cirúrgico',
+]
+FABRICANTES = ['Philips', 'GE', 'Mindray', 'Dräger', 'B. Braun', 'Baxter', 'Medtronic']
+SERVICOS = ['Troca de cabo', 'Substituição de bateria', 'Ajuste', 'Limpeza', 'Teste funcional']
+
+# Frequência de cada forma de digitação (ver _variantes); a primeira é a canônica
+PESOS_VARIANTES = [0.55, 0.2, 0.05, 0.05, 0.05, 0.05, 0.05]
+
+
+def _sem_acentos(texto):
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+def _variantes(texto):
+    """Formas como o mesmo texto aparece digitado na planilha."""
+    return [
+        texto, texto.lower(), texto.upper(), f" {texto}", texto.replace(' ', '  ', 1),
+        f"{texto.lower()}.", _sem_acentos(texto).lower(),
+    ]
+
+
+class Cadastro:
+    """Clientes, o peso de cada um no volume de OS e seus atributos fixos (só dependem da semente)."""
+
+    def __init__(self, semente, clientes=40):
+        rng = np.random.default_rng([semente, 0])
+        self.clientes = np.array([f"Hospital {i:02d}" for i in range(1, clientes + 1)], dtype=object)
+
+        # Volume desigual entre clientes (lei de potência)
+        pesos = 1 / np.arange(1, clientes + 1) ** 0.8
+        self.pesos = rng.permutation(pesos / pesos.sum())
+
+        regiao = rng.integers(1, 6, clientes)
+        self.atributos = pd.DataFrame({
+            'SUPERVISOR': [f"Supervisor {s}" for s in rng.integers(1, 9, clientes)],
+            'COORDENADOR': [f"Coordenador {c}" for c in rng.integers(1, 4, clientes)],
+            'REGIÃO': [f"Região {r}" for r in regiao],
+            'CIDADE': [f"Cidade {(r - 1) * 3 + c:02d}" for r, c in zip(regiao, rng.integers(1, 4, clientes))],
+            'GRUPO': [f"Grupo {g}" for g in rng.integers(1, 5, clientes)],
+        })
+
+
+def _escolher(rng, valores, linhas, p=None):
+    return np.asarray(valores, dtype=object)[rng.choice(len(valores), linhas, p=p)]
+
+
+def _texto_digitado(rng, canonicos, linhas):
+    tabela = np.array([_variantes(t) for t in canonicos], dtype=object)
+    canonico = rng.integers(0, len(canonicos), linhas)
+    variante = rng.choice(len(PESOS_VARIANTES), linhas, p=PESOS_VARIANTES)
+    return pd.Series(tabela[canonico, variante])
+
+
+def _codigos(rng, prefixo, inicio, fim, linhas):
+    return np.char.add(prefixo, rng.integers(inicio, fim, linhas).astype(str)).astype(object)
+
+
+def _gerar_bloco(rng, cadastro, linhas, primeira_os, inicio, fim):
+    periodo = (fim - inicio).total_seconds()
+
+    # 30% uniforme no período e 70% com densidade crescente (carteira crescendo)
+    fracao = np.where(rng.random(linhas) < 0.3, rng.random(linhas), np.sqrt(rng.random(linhas)))
+    dia = (inicio + pd.to_timedelta((fracao * periodo).astype('int64'), unit='s')).normalize()
+    domingo = dia.dayofweek == 6
+    dia = dia - pd.to_timedelta(np.where(domingo, rng.integers(1, 7, linhas), 0), unit='D')
+    abertura = dia + pd.to_timedelta(rng.integers(7 * 3600, 19 * 3600, linhas), unit='s')
+    abertura = abertura.where(abertura >= inicio, inicio).where(abertura <= fim, fim)
+
+    # Backlog antigo residual (~15%) e quase tudo em aberto nos últimos dias
+    idade_dias = (fim - abertura).total_seconds().to_numpy() / 86400
+    fechada = rng.random(linhas) < 0.85 - 0.75 * np.exp(-idade_dias / 30)
+    situacao = np.where(
+        fechada, 'Fechada', _escolher(rng, list(SITUACOES_ABERTAS), linhas, p=list(SITUACOES_ABERTAS.values()))
+    ).astype(object)
+
+    dias_atendimento = np.minimum(rng.lognormal(np.log(4), 1.1, linhas), idade_dias)
+    fechamento = pd.Series((abertura + pd.to_timedelta(dias_atendimento * 86400, unit='s')).floor('s'))
+    fechamento = fechamento.where(situacao == 'Fechada')
+
+    indice_cliente = rng.choice(len(cadastro.clientes), linhas, p=cadastro.pesos)
+    cliente = cadastro.clientes[indice_cliente]
+    sorteio = rng.random(linhas)
+    cliente = np.where(sorteio < 0.005, '-', np.where(sorteio < 0.01, None, cliente)).astype(object)
+    atributos = cadastro.atributos.iloc[indice_cliente]
+
+    em_aberto = np.isin(situacao, ['Aberta', 'Pendente']) & (rng.random(linhas) < 0.75)
+
+    numero_chamado = rng.integers(10_000, 999_999, linhas)
+    forma_chamado = rng.random(linhas)
+    chamado = np.where(
+        forma_chamado < 0.6, numero_chamado.astype(object),
+        np.where(forma_chamado < 0.8, np.char.add('CH-', numero_chamado.astype(str)).astype(object), None)
+    )
+
+    return pd.DataFrame({
+        'OS': np.arange(primeira_os, primeira_os + linhas),
+        'CLIENTE': cliente,
+        'Nº Chamado': chamado,
+        'Abertura': abertura.floor('s'),
+        'Fechamento': fechamento,
+        **{col: atributos[col].to_numpy() for col in atributos.columns},
+        'TIPO DE MANUTENÇÃO2': _escolher(rng, list(TIPOS), linhas, p=list(TIPOS.values())),
+        'SITUAÇÃO OS': situacao,
+        'PENDÊNCIAS EM ABERTO': _texto_digitado(rng, PENDENCIAS, linhas).where(em_aberto),
+        'CAUSA': _texto_digitado(rng, CAUSAS, linhas).where(rng.random(linhas) < 0.8),
+        'OCORRÊNCIA': _texto_digitado(rng, OCORRENCIAS, linhas).where(rng.random(linhas) < 0.9),
+        'EQUIPAMENTO': _escolher(rng, EQUIPAMENTOS, linhas),
+        'MODELO': _codigos(rng, 'MOD-', 100, 999, linhas),
+        'FABRICANTE': _escolher(rng, FABRICANTES, linhas),
+        'Nº SÉRIE': _codigos(rng, 'SN', 10 ** 7, 10 ** 8, linhas),
+        'PATRIMÔNIO': rng.integers(10_000, 999_999, linhas),
+        'TÉCNICO': _codigos(rng, 'Técnico ', 1, 120, linhas),
+        'DESCRIÇÃO DO SERVIÇO': _escolher(rng, SERVICOS, linhas),
+        'OBSERVAÇÃO': np.where(rng.random(linhas) < 0.3, 'Verificar na próxima preventiva', None).astype(object),
+    })
+
+
+def gerar_blocos(linhas, semente=0, inicio='2022-01-01', fim='2025-08-31', tamanho_bloco=TAMANHO_BLOCO):
+    """Gera as OS em DataFrames de até `tamanho_bloco` linhas, com números de OS contínuos."""
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    cadastro = Cadastro(semente)
+    for numero, primeira in enumerate(range(0, linhas, tamanho_bloco)):
+        rng = np.random.default_rng([semente, 1, numero])
+        yield _gerar_bloco(rng, cadastro, min(tamanho_bloco, linhas - primeira), primeira + 1, inicio, fim)
+
+
+def gerar_os(linhas, semente=0, **kwargs):
+    """DataFrame de OS sintético; a mesma semente gera sempre os mesmos dados."""
+    return pd.concat(gerar_blocos(linhas, semente, **kwargs), ignore_index=True)
+
+
+def _bloco_parquet(bloco):
+    # Coluna mista (número/código) vira texto, como no snapshot
+    chamado = bloco['Nº Chamado']
+    return bloco.assign(**{'Nº Chamado': chamado.where(chamado.isna(), chamado.astype(str))})
+
+
+def gravar_parquet(caminho, linhas, semente=0, **kwargs):
+    """Grava as OS sintéticas em Parquet bloco a bloco (memória de um bloco, não do arquivo)."""
+    escritor = None
+    try:
+        for bloco in gerar_blocos(linhas, semente, **kwargs):
+            tabela = pa.Table.from_pandas(_bloco_parquet(bloco), preserve_index=False)
+            if escritor is None:
+                esquema = tabela.schema
+                escritor = pq.ParquetWriter(caminho, esquema, compression='zstd')
+            escritor.write_table(tabela.cast(esquema))
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return caminho
+
+
+def ler_parquet(caminho):
+    """Lê o Parquet sintético como a aba do Excel seria lida (só as colunas usadas)."""
+    usadas = colunas_usadas(pq.read_schema(caminho).names)
+    return pd.read_parquet(caminho, columns=usadas)
+
+
+def gravar_planilha(df, caminho, sheet_name=SHEET_NAME):
+    """Grava o DataFrame como Excel linha a linha (memória constante), com células de data."""
+    if len(df) > LIMITE_LINHAS_EXCEL:
+        raise ValueError(f"O Excel comporta no máximo {LIMITE_LINHAS_EXCEL} linhas por aba; use Parquet.")
+
+    livro = xlsxwriter.Workbook(caminho, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy hh:mm'})
+    aba = livro.add_worksheet(sheet_name)
+    aba.write_row(0, 0, list(df.columns))
+
+    colunas = []
+    for col in df.columns:
+        valores = df[col]
+        if pd.api.types.is_datetime64_any_dtype(valores):
+            colunas.append([v.to_pydatetime() if pd.notna(v) else None for v in valores])
+        else:
+            colunas.append([None if (v is None or (isinstance(v, float) and np.isnan(v)) or v == '') else v
+                            for v in valores.tolist()])
+
+    for i, linha in enumerate(zip(*colunas), start=1):
+        aba.write_row(i, 0, linha)
+    livro.close()
+    return caminho
+
+
+def numero_linhas(texto):
+    """Número de linhas a partir de '250000' ou de um tamanho padrão ('10k', '100k', '1m', '10m')."""
+    return TAMANHOS.get(str(texto).lower()) or int(texto)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera OS sintéticas em Excel (.xlsx) ou Parquet (.parquet).")
+    parser.add_argument("destino")
+    parser.add_argument("--linhas", type=numero_linhas, default=100_000, help="Número de linhas ou 10k/100k/1m/10m")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.destino.endswith(".parquet"):
+        gravar_parquet(args.destino, args.linhas, args.semente)
+    else:
+        gravar_planilha(gerar_os(args.linhas, args.semente), args.destino)
+    print(f"✅ {args.linhas} linhas em {args.destino} ({time.perf_counter() - inicio:.1f}s)")
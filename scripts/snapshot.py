@@ -0,0 +1,348 @@
+# scripts/snapshot.py
+
+"""Snapshot colunar (Parquet) da planilha de OS.
+
+Na primeira carga a aba do Excel é convertida para Parquet tipado, um arquivo
+por mês de abertura, numa pasta identificada pelo hash do arquivo de origem.
+Nas cargas seguintes as partições são lidas com memory-map e o openpyxl não é
+usado. O manifesto guarda a menor e a maior data de abertura de cada partição,
+e leituras com período só abrem as partições que cruzam o intervalo.
+
+Quando a origem muda e a versão anterior está disponível, a ingestão é
+incremental: as linhas são comparadas pelo conteúdo (inclusive o número da
+OS), e só as partições dos meses com OS novas, alteradas ou removidas são
+regravadas; as outras são reaproveitadas por hard link.
+
+Gravar um snapshot não apaga os outros: quem está servindo uma versão ainda
+lê a pasta dela. A limpeza (`remover_antigos`) fica com o atualizador do
+painel, depois de trocar a versão; a CLI e os relatórios nunca removem nada.
+
+Reconstrução antecipada (ex.: antes de subir o Streamlit ou rodar o
+enviar_ranking.py):
+
+    python -m scripts.snapshot
+    python -m scripts.snapshot --arquivo /caminho/dados.xlsx --forcar
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from config.paths import SNAPSHOT_DIR
+
+logger = logging.getLogger(__name__)
+
+# Incrementar sempre que o formato das colunas gravadas mudar
+VERSAO_SNAPSHOT = 8
+
+PREFIXO = "os_"
+MANIFESTO = "manifesto.json"
+
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Calcula o SHA-256 do arquivo de origem (bem mais barato que reparsear o Excel)."""
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def chave_snapshot(hash_origem):
+    """Chave do snapshot: hash da origem + versão do formato."""
+    return f"v{VERSAO_SNAPSHOT}_{hash_origem[:16]}"
+
+
+def caminho_snapshot(chave, pasta=SNAPSHOT_DIR):
+    """Pasta do snapshot: um Parquet por mês de abertura e um manifesto."""
+    return os.path.join(pasta, f"{PREFIXO}{chave}")
+
+
+def _arquivo_particao(mes):
+    return f"mes={int(mes)}.parquet"
+
+
+def _tipar_colunas(df):
+    """Deixa as colunas object homogêneas para o Parquet.
+
+    Colunas do Excel costumam misturar números e textos (ex.: 'Nº Chamado');
+    nesses casos os valores não nulos viram texto.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        tipo = pd.api.types.infer_dtype(df[col], skipna=True)
+        if tipo not in ("string", "empty"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def hash_linhas(df):
+    """Hash de cada linha pelo conteúdo (independe da largura dos inteiros e das categorias)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def meses_alterados(anterior, novo):
+    """Meses de abertura com alguma OS nova, alterada ou removida entre duas versões."""
+    hash_anterior = hash_linhas(anterior)
+    hash_novo = hash_linhas(novo)
+    novas = ~np.isin(hash_novo, hash_anterior)
+    removidas = ~np.isin(hash_anterior, hash_novo)
+
+    meses = set(novo['Mes_Abertura'].to_numpy()[novas].tolist())
+    meses |= set(anterior['Mes_Abertura'].to_numpy()[removidas].tolist())
+
+    logger.info(
+        "Ingestão incremental: %d linhas novas/alteradas, %d removidas/substituídas, %d meses afetados",
+        novas.sum(), removidas.sum(), len(meses)
+    )
+    return sorted(meses)
+
+
+def _reaproveitar(origem, destino):
+    """Hard link do arquivo da versão anterior (cópia se o sistema de arquivos não suportar)."""
+    try:
+        os.link(origem, destino)
+    except OSError:
+        shutil.copy2(origem, destino)
+
+
+def remover_antigos(manter, pasta=SNAPSHOT_DIR):
+    """Apaga os snapshots cujas chaves não estão em `manter`.
+
+    Pastas .tmp são gravações em andamento (deste ou de outro processo) e
+    ficam sempre.
+    """
+    manter = {caminho_snapshot(chave, pasta) for chave in manter if chave}
+    for antigo in glob.glob(os.path.join(pasta, f"{PREFIXO}*")):
+        if antigo in manter or antigo.endswith(".tmp"):
+            continue
+        logger.info("Removendo snapshot antigo %s", antigo)
+        if os.path.isdir(antigo):
+            shutil.rmtree(antigo, ignore_errors=True)
+        else:
+            os.remove(antigo)
+
+
+def _ler_manifesto(pasta_snapshot):
+    try:
+        with open(os.path.join(pasta_snapshot, MANIFESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _estatisticas(parte):
+    """Menor e maior data de abertura da partição (None quando não há datas)."""
+    limites = pc.min_max(parte.column('Abertura'))
+    minimo, maximo = limites['min'].as_py(), limites['max'].as_py()
+    return {
+        "abertura_min": minimo.isoformat() if minimo is not None else None,
+        "abertura_max": maximo.isoformat() if maximo is not None else None,
+    }
+
+
+def particoes_no_periodo(manifesto, data_inicio=None, data_fim=None):
+    """Partições (em ordem de mês) cujo intervalo de abertura cruza [data_inicio, data_fim].
+
+    Sem período, todas. Com período, partições sem data de abertura ficam de fora.
+    """
+    particoes = sorted(manifesto["particoes"].items(), key=lambda item: int(item[0]))
+    if data_inicio is None and data_fim is None:
+        return [info for _, info in particoes]
+
+    # data_fim é inclusiva (o dia inteiro)
+    inicio = pd.Timestamp(data_inicio) if data_inicio is not None else None
+    fim = pd.Timestamp(data_fim) + pd.Timedelta(days=1) if data_fim is not None else None
+
+    selecionadas = []
+    for _, info in particoes:
+        if info["abertura_min"] is None:
+            continue
+        if inicio is not None and pd.Timestamp(info["abertura_max"]) < inicio:
+            continue
+        if fim is not None and pd.Timestamp(info["abertura_min"]) >= fim:
+            continue
+        selecionadas.append(info)
+    return selecionadas
+
+
+def salvar_snapshot(df, chave, pasta=SNAPSHOT_DIR, anterior=None, meses=None):
+    """Grava o snapshot particionado por mês de abertura, de forma atômica.
+
+    Com `anterior` (chave do snapshot anterior) e `meses` (meses alterados),
+    só as partições desses meses são escritas; as demais são reaproveitadas
+    da versão anterior, desde que o esquema das colunas não tenha mudado.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    destino = caminho_snapshot(chave, pasta)
+    temporario = destino + ".tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    tabela = pa.Table.from_pandas(_tipar_colunas(df), preserve_index=False)
+    tabela = tabela.replace_schema_metadata(None)
+    esquema = tabela.schema.to_string()
+
+    manifesto_anterior = _ler_manifesto(caminho_snapshot(anterior, pasta)) if anterior else None
+    reaproveita = (
+        meses is not None
+        and manifesto_anterior is not None
+        and manifesto_anterior.get("esquema") == esquema
+    )
+    alterados = set(meses or [])
+
+    codigos_mes = df['Mes_Abertura'].to_numpy()
+    particoes = {}
+    escritas = 0
+    for mes in np.unique(codigos_mes).tolist():
+        nome = _arquivo_particao(mes)
+        arquivo = os.path.join(temporario, nome)
+        if reaproveita and mes not in alterados and str(mes) in manifesto_anterior["particoes"]:
+            _reaproveitar(os.path.join(caminho_snapshot(anterior, pasta), nome), arquivo)
+            particoes[str(mes)] = manifesto_anterior["particoes"][str(mes)]
+            continue
+
+        parte = tabela.filter(pa.array(codigos_mes == mes))
+        pq.write_table(parte, arquivo, compression="zstd")
+        particoes[str(mes)] = {"arquivo": nome, "linhas": parte.num_rows, **_estatisticas(parte)}
+        escritas += 1
+
+    # Memória antes/depois do esquema compacto (attrs de aplicar_esquema, que não passam pelo Parquet)
+    memoria = {etapa: float(mb) for etapa, mb in df.attrs.get("memoria_mb", {}).items()} or None
+
+    with open(os.path.join(temporario, MANIFESTO), "w", encoding="utf-8") as f:
+        json.dump({"chave": chave, "esquema": esquema, "particoes": particoes, "memoria_mb": memoria}, f)
+
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporario, destino)
+
+    logger.info("Snapshot %s: %d de %d partições escritas", chave, escritas, len(particoes))
+    return destino
+
+
+def snapshot_atual(pasta=SNAPSHOT_DIR):
+    """Chave do snapshot completo mais recente na pasta (None se não houver)."""
+    candidatos = [
+        destino for destino in glob.glob(os.path.join(pasta, f"{PREFIXO}v{VERSAO_SNAPSHOT}_*"))
+        if os.path.isdir(destino) and not destino.endswith(".tmp") and _ler_manifesto(destino) is not None
+    ]
+    if not candidatos:
+        return None
+    return os.path.basename(max(candidatos, key=os.path.getmtime))[len(PREFIXO):]
+
+
+def ler_snapshot(chave, pasta=SNAPSHOT_DIR, data_inicio=None, data_fim=None):
+    """Lê as partições do snapshot com memory-map. Retorna None se ele não existir.
+
+    Com período, só as partições que cruzam [data_inicio, data_fim] são lidas
+    (poda pelas estatísticas do manifesto); as linhas fora do período dentro
+    dessas partições continuam no resultado e o filtro fino fica com quem chama.
+    """
+    destino = caminho_snapshot(chave, pasta)
+    manifesto = _ler_manifesto(destino)
+    if manifesto is None:
+        return None
+
+    particoes = particoes_no_periodo(manifesto, data_inicio, data_fim)
+    tabelas = [
+        pq.read_table(os.path.join(destino, info["arquivo"]), memory_map=True)
+        for info in particoes
+    ]
+    if not tabelas:
+        # Nenhuma partição no período: DataFrame vazio com as colunas do snapshot
+        primeira = next(iter(manifesto["particoes"].values()))
+        tabelas = [pq.read_table(os.path.join(destino, primeira["arquivo"]), memory_map=True).slice(0, 0)]
+
+    logger.info("Snapshot %s: %d de %d partições lidas", chave, len(particoes), len(manifesto["particoes"]))
+    df = pa.concat_tables(tabelas).to_pandas()
+
+    # Cada partição tem seu dicionário; as categorias voltam em ordem alfabética
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def carregar_ou_gerar_snapshot(caminho_origem, leitor, forcar=False, pasta=SNAPSHOT_DIR, hash_origem=None, anterior=None,
+                               data_inicio=None, data_fim=None):
+    """Devolve o DataFrame do snapshot, gerando-o com `leitor` quando necessário.
+
+    `leitor` recebe o caminho do Excel e devolve o DataFrame já tratado.
+    `hash_origem` evita recalcular o hash quando ele já é conhecido.
+    `anterior` é a chave do snapshot anterior: quando informada, a ingestão é
+    incremental (o snapshot anterior é lido do disco só para a comparação) e
+    `attrs['meses_alterados']` traz os meses de abertura que mudaram, também
+    quando outro processo (ex.: um relatório) já gravou o snapshot novo. É
+    None quando não há com o que comparar e tudo foi regravado.
+    `data_inicio`/`data_fim` limitam a leitura às partições do período.
+    """
+    chave = chave_snapshot(hash_origem or hash_arquivo(caminho_origem))
+
+    df = None if forcar else ler_snapshot(chave, pasta, data_inicio, data_fim)
+    gerar = df is None
+    if gerar:
+        df = leitor(caminho_origem)
+
+    meses = None
+    if anterior and anterior != chave:
+        dados_anteriores = ler_snapshot(anterior, pasta)
+        if dados_anteriores is None:
+            logger.warning("Snapshot anterior %s não encontrado; ingestão completa em vez de incremental", anterior)
+        else:
+            meses = meses_alterados(dados_anteriores, _tipar_colunas(df))
+            del dados_anteriores
+
+    if gerar:
+        salvar_snapshot(df, chave, pasta, anterior=anterior if meses is not None else None, meses=meses)
+        df = ler_snapshot(chave, pasta, data_inicio, data_fim)
+
+    df.attrs["versao_snapshot"] = chave
+    df.attrs["meses_alterados"] = meses
+    return df
+
+
+def main(argv=None):
+    from scripts.leitura_dados import buscar_planilha, ler_planilha
+
+    parser = argparse.ArgumentParser(description="Reconstrói o snapshot Parquet da planilha de OS.")
+    parser.add_argument("--arquivo", help="Excel local (padrão: baixa do Google Drive)")
+    parser.add_argument("--pasta", default=SNAPSHOT_DIR, help="Pasta de saída do snapshot")
+    parser.add_argument("--forcar", action="store_true", help="Regera mesmo se já existir snapshot para o arquivo")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    if args.arquivo:
+        origem, hash_origem = args.arquivo, None
+    else:
+        busca = buscar_planilha()
+        origem, hash_origem = busca.caminho, busca.sha256
+
+    df = carregar_ou_gerar_snapshot(
+        origem, ler_planilha, forcar=args.forcar, pasta=args.pasta, hash_origem=hash_origem
+    )
+    duracao = time.perf_counter() - inicio
+
+    chave = df.attrs["versao_snapshot"]
+    print(f"✅ Snapshot {chave}: {len(df)} linhas em {duracao:.2f}s")
+    print(f"📄 {caminho_snapshot(chave, args.pasta)}")
+
+    memoria = (_ler_manifesto(caminho_snapshot(chave, args.pasta)) or {}).get("memoria_mb")
+    if memoria:
+        print(f"🧮 Memória: {memoria['antes']} MB (Excel) -> {memoria['depois']} MB (esquema compacto)")
+
+
+if __name__ == "__main__":
+    main()